@@ -16,6 +16,14 @@ PATH_CONFIG = f"{PATH_CORE}"
 """ DEFAULTS """
 DEFAULT_UPDATE_INTERVAL = 30
 
+""" STATE STORAGE """
+STATE_LAYOUT_KEYS = "keys"
+STATE_LAYOUT_HASH = "hash"
+REDIS_STATES_HASH = "mudpi:states"
+REDIS_STATES_SET = "mudpi:state_keys"
+REDIS_STATE_VERSION = "mudpi:state_version"
+REDIS_STATE_VERSIONS = "mudpi:state_versions"
+
 """ DATES / TIMES """
 MONTHS = {
 	'jan': 'January',
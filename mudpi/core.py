@@ -8,6 +8,8 @@ from mudpi.config import Config
 from mudpi.events import EventSystem
 from mudpi.logger.Logger import Logger, LOG_LEVEL
 from mudpi.managers.state_manager import StateManager
+from mudpi.managers.timer_manager import TimerManager
+from mudpi.managers.action_executor import ActionExecutor
 from mudpi.exceptions import ConfigNotFoundError, ConfigFormatError
 from mudpi.registry import Registry, ActionRegistry, ComponentRegistry
 from mudpi.constants import DEFAULT_CONFIG_FILE, IMPERIAL_SYSTEM, METRIC_SYSTEM
@@ -133,15 +135,23 @@ class MudPi:
 
         self.state = CoreState.loading
 
-        self.states = StateManager(self, self.config.get('mudpi', {}).get('events', {}).get('redis'))
+        self.timers = TimerManager(self)
+        self.threads['timers'] = self.timers.start()
+
+        self.states = StateManager(self, self.config.get('mudpi', {}).get('events', {}).get('redis'), 
+            self.config.get('mudpi', {}).get('states', {}))
         
         self.events = EventSystem(self.config.get('mudpi', {}).get('events', {}))
         self.events.connect()
         self.events.subscribe('action_call', self.actions.handle_call)
+        self.actions.audit = self.config.get('mudpi', {}).get('actions', {}).get('audit', True)
+        self.actions.executor = ActionExecutor(self, self.config.get('mudpi', {}).get('actions', {}))
 
         self.actions.register('turn_on', self.start, 'mudpi')
         self.actions.register('turn_off', self.stop, namespace='mudpi')
         self.actions.register('shutdown', self.shutdown, namespace='mudpi')
+        self.actions.register('history', self.states.history_action, namespace='state')
+        self.actions.register('changes', self.states.changes_action, namespace='state')
 
         self.state = CoreState.loaded
         self.events.publish('core', {'event': 'Loaded'})
@@ -183,6 +193,9 @@ class MudPi:
         self.stop()
         self.events.publish('core', {'event': 'ShuttingDown'})
         self.unload_extensions()
+        self.states.close()
+        self.timers.stop()
+        self.actions.executor.shutdown()
         self.thread_events['mudpi_running'].clear()
         self.state = CoreState.not_running
 
@@ -233,14 +246,28 @@ class MudPi:
 
     def restore_states(self):
         """ Restore previous components states on first boot """
-        _comp_ids = self.components.ids()
+        _start = time.perf_counter()
+        _restored = 0
+        _stale_ids = []
         for state_id in self.states.ids():
-            if state_id in _comp_ids:
-                comp = self.components.get(state_id)
+            comp = self.components.get(state_id)
+            if comp is not None:
                 comp.restore_state(self.states.get(state_id))
+                _restored += 1
                 Logger.log(LOG_LEVEL["debug"], f"Restored State for {state_id}")
             else:
-                self.states.remove(state_id)
+                _stale_ids.append(state_id)
+        if _stale_ids:
+            self.states.remove_many(_stale_ids)
+
+        _duration = time.perf_counter() - _start
+        self.cache.setdefault('metrics', {})['component_restore'] = {
+            'restored': _restored,
+            'removed': len(_stale_ids),
+            'duration': round(_duration, 4)
+        }
+        Logger.log(LOG_LEVEL["debug"],
+            f"Restored {_restored} Component States in {_duration * 1000:.1f}ms")
 
 
 
@@ -0,0 +1,92 @@
+#!/usr/bin/env python
+
+# Description: Measure set and restore throughput of the state backends
+# Dependencies: redis server for the `redis` backend (skipped if offline)
+# Usage: python -m mudpi.debug.state_benchmark [states] [updates]
+
+import os
+import sys
+import time
+import tempfile
+from mudpi.logger.Logger import Logger
+from mudpi.managers.timer_manager import TimerManager
+from mudpi.managers.state_manager import StateManager
+
+
+class BenchmarkEvents:
+    """ Event system that drops events to only time the backend """
+    def publish(self, topic, data=None):
+        return True
+
+
+class BenchmarkConfig:
+    def __init__(self, path):
+        self.config_path = path
+
+    def path(self, *path):
+        return os.path.join(self.config_path, *path)
+
+
+class BenchmarkMudPi:
+    """ Minimal core with the parts the state manager uses """
+    def __init__(self, path):
+        self.cache = {}
+        self.events = BenchmarkEvents()
+        self.config = BenchmarkConfig(path)
+        # Not started so backends only flush when told to
+        self.timers = TimerManager(self)
+
+
+def benchmark(backend, config, states=200, updates=20):
+    """ Time `states * updates` sets followed by a restore """
+    mudpi = BenchmarkMudPi(config.get('path_dir', tempfile.gettempdir()))
+    manager = StateManager(mudpi, config={'backend': backend, 'history': False, **config})
+    _ids = [f'benchmark_{index}' for index in range(states)]
+
+    start = time.perf_counter()
+    for update in range(updates):
+        for index, _id in enumerate(_ids):
+            manager.set(_id, {'value': update + index * 0.01, 'update': update})
+    manager.backend.flush()
+    set_duration = time.perf_counter() - start
+    manager.close()
+
+    start = time.perf_counter()
+    restored = StateManager(mudpi, config={'backend': backend, 'history': False, **config})
+    restore_duration = time.perf_counter() - start
+    restored_count = len(restored.ids())
+    restored.remove_many(_ids)
+    restored.close()
+
+    return {
+        'sets_per_second': states * updates / set_duration,
+        'restore_seconds': restore_duration,
+        'restored': restored_count
+    }
+
+
+if __name__ == '__main__':
+    states = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    updates = int(sys.argv[2]) if len(sys.argv) > 2 else 20
+    directory = tempfile.mkdtemp()
+    Logger.logger = Logger({
+        'mudpi': {'name': 'benchmark', 'debug': False},
+        'logging': {'file': os.devnull, 'file_log_level': 'error', 'terminal_log_level': 'error'}
+    })
+
+    backends = {
+        'memory': {},
+        'sqlite': {'path': os.path.join(directory, 'benchmark.db')},
+        'redis': {'layout': 'keys'},
+        'redis (hash)': {'layout': 'hash'}
+    }
+
+    print(f'{"BACKEND":<16} {"SETS/SEC":>12} {"RESTORE MS":>12} {"RESTORED":>10}')
+    for name, config in backends.items():
+        try:
+            result = benchmark(name.split(' ')[0], {**config, 'path_dir': directory}, states, updates)
+        except Exception as error:
+            print(f'{name:<16} skipped: {error}')
+            continue
+        print(f'{name:<16} {result["sets_per_second"]:>12.0f} '
+              f'{result["restore_seconds"] * 1000:>12.2f} {result["restored"]:>10}')
@@ -0,0 +1,106 @@
+#!/usr/bin/env python
+
+# Description: Compare trigger threshold checks parsed each call against compiled checks
+# Dependencies: None
+# Usage: python -m mudpi.debug.threshold_benchmark [evaluations]
+
+import os
+import sys
+import json
+import time
+import datetime
+from mudpi import utils  # Load extensions in the same order as the core
+from mudpi.logger.Logger import Logger
+from mudpi.extensions.trigger import compile_thresholds
+
+
+THRESHOLDS = {
+    'number': [{'comparison': 'gte', 'value': 5}],
+    'typed': [{'comparison': 'lt', 'value': '30.5', 'type': 'float', 'source_type': 'float'}],
+    'range': [{'comparison': 'gt', 'value': 10, 'type': 'int'},
+              {'comparison': 'lte', 'value': 50, 'type': 'int'}],
+    'datetime': [{'comparison': 'gte', 'value': '06:30 AM', 'type': 'datetime', 'source_type': 'datetime'}]
+}
+
+VALUES = {
+    'number': 7,
+    'typed': '21.2',
+    'range': 25,
+    'datetime': '08:15 AM'
+}
+
+
+def parse_each_call(thresholds, value):
+    """ Threshold checks as done before compiling. Parses every
+        threshold on each call and compares the raw value. """
+    thresholds_passed = False if len(thresholds) > 0 else True
+    for threshold in thresholds:
+        if threshold.get("type", None) is not None:
+            _type = str(threshold["type"])
+            if _type == "int":
+                _threshold_value = int(threshold["value"])
+            if _type == "float":
+                _threshold_value = float(threshold["value"])
+            if _type == "str":
+                _threshold_value = str(threshold["value"])
+            if _type == "list" or _type == "dict" or _type == "json":
+                _threshold_value = json.loads(threshold["value"])
+            if _type == "datetime":
+                _format = threshold.get("format", "%I:%M %p")
+                _threshold_value = datetime.datetime.strptime(threshold["value"], _format)
+
+        if threshold.get("source_type", None) is not None:
+            _source_type = str(threshold["source_type"])
+            if _source_type == "int":
+                value = int(value)
+            if _source_type == "float":
+                value = float(value)
+            if _source_type == "str":
+                value = str(value)
+            if _source_type == "list" or _source_type == "dict" or _source_type == "json":
+                value = json.loads(value)
+            if _source_type == "datetime":
+                _source_format = threshold.get("source_format", "%I:%M %p")
+                value = datetime.datetime.strptime(value, _source_format)
+
+        comparison = threshold.get("comparison", "eq")
+        try:
+            if comparison == "eq" or comparison == "==":
+                thresholds_passed = value == threshold["value"]
+            elif comparison == "ne" or comparison == "!=":
+                thresholds_passed = value != threshold["value"]
+            elif comparison == "gt" or comparison == ">":
+                thresholds_passed = value > threshold["value"]
+            elif comparison == "gte" or comparison == ">=":
+                thresholds_passed = value >= threshold["value"]
+            elif comparison == "lt" or comparison == "<":
+                thresholds_passed = value < threshold["value"]
+            elif comparison == "lte" or comparison == "<=":
+                thresholds_passed = value <= threshold["value"]
+        except TypeError:
+            thresholds_passed = False
+    return thresholds_passed
+
+
+def benchmark(func, evaluations):
+    """ Return evaluations per second of func """
+    start = time.perf_counter()
+    for _ in range(evaluations):
+        func()
+    return evaluations / (time.perf_counter() - start)
+
+
+if __name__ == '__main__':
+    evaluations = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+    Logger.logger = Logger({
+        'mudpi': {'name': 'benchmark', 'debug': False},
+        'logging': {'file': os.devnull, 'file_log_level': 'error', 'terminal_log_level': 'error'}
+    })
+
+    print(f'{"THRESHOLDS":<12} {"PARSED/SEC":>14} {"COMPILED/SEC":>14} {"SPEEDUP":>9}')
+    for name, thresholds in THRESHOLDS.items():
+        value = VALUES[name]
+        check = compile_thresholds(thresholds)
+        before = benchmark(lambda: parse_each_call(thresholds, value), evaluations)
+        after = benchmark(lambda: check(value), evaluations)
+        print(f'{name:<12} {before:>14.0f} {after:>14.0f} {after / before:>8.1f}x')
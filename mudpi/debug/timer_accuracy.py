@@ -0,0 +1,72 @@
+#!/usr/bin/env python
+
+# Description: Measure how late timer triggers fire after their deadline
+# Dependencies: None
+# Usage: python -m mudpi.debug.timer_accuracy [timers] [duration]
+
+import os
+import sys
+import time
+from mudpi import utils  # Load extensions in the same order as the core
+from mudpi.logger.Logger import Logger
+from mudpi.managers.timer_manager import TimerManager
+from mudpi.extensions.timer.trigger import TimerTrigger
+
+
+class Events:
+    def subscribe(self, *args):
+        pass
+
+    def publish(self, *args):
+        pass
+
+
+class Actions:
+    def plan(self, action):
+        return None
+
+
+class MudPi:
+    """ Just enough of the core to run timer triggers """
+    is_prepared = False
+    is_running = True
+
+    def __init__(self):
+        self.cache = {}
+        self.config = {}
+        self.events = Events()
+        self.actions = Actions()
+        self.timers = TimerManager(self)
+
+
+if __name__ == '__main__':
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 100
+    duration = float(sys.argv[2]) if len(sys.argv) > 2 else 1
+    Logger.logger = Logger({
+        'mudpi': {'name': 'benchmark', 'debug': False},
+        'logging': {'file': os.devnull, 'file_log_level': 'error', 'terminal_log_level': 'error'}
+    })
+
+    mudpi = MudPi()
+    mudpi.timers.start()
+    triggers = [ TimerTrigger(mudpi, {'key': f'timer_{index}', 'duration': duration})
+        for index in range(count) ]
+
+    idle_start = time.process_time()
+    time.sleep(duration)
+    idle_cpu = time.process_time() - idle_start
+
+    for trigger in triggers:
+        # Spread the deadlines across the duration
+        trigger.start()
+        time.sleep(duration / count)
+    time.sleep(duration * 1.5)
+
+    lateness = sorted(mudpi.cache['metrics']['triggers'][trigger.id]['lateness'] or 0
+        for trigger in triggers)
+    fired = sum(mudpi.cache['metrics']['triggers'][trigger.id]['fired'] for trigger in triggers)
+    mudpi.timers.stop()
+
+    print(f'Timers: {count}  Fired: {fired}  Idle CPU: {idle_cpu * 1000:.2f} ms over {duration}s')
+    print(f'Lateness ms  avg: {sum(lateness) / len(lateness) * 1000:.3f}  '
+        f'p99: {lateness[int(len(lateness) * 0.99) - 1] * 1000:.3f}  max: {lateness[-1] * 1000:.3f}')
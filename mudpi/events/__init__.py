@@ -6,9 +6,12 @@
     Available Adaptors: 'mqtt', 'redis'
     Default: redis
 """
+import threading
 from uuid import uuid4
 from copy import deepcopy
+from collections import OrderedDict
 from mudpi.events import adaptors
+from mudpi.utils import decode_event_data
 from mudpi.logger.Logger import Logger, LOG_LEVEL
 
 
@@ -21,6 +24,11 @@ class EventSystem():
         self.prefix = config.get('prefix', 'mudpi_core_')
         self.topics = {}
         self.adaptors = {}
+        # Event uuids remembered per subscriber to drop duplicates
+        self.dedupe_size = config.get('dedupe_size', 1024)
+        self._subscribers = {}
+        # Topics of each subscriber so wrappers are dropped on unsubscribe
+        self._subscriber_topics = {}
         self._load_adaptors()
 
     def connect(self):
@@ -46,6 +54,8 @@ class EventSystem():
 
     def subscribe(self, topic, callback):
         """ Add a subscriber to an event """
+        self._subscriber_topics.setdefault(callback, set()).add(topic)
+        callback = self._unique(callback)
         for key, adaptor in self.adaptors.items():
             adaptor.subscribe(topic, callback)
             self.topics[key].append(topic)
@@ -56,10 +66,18 @@ class EventSystem():
         for key, adaptor in self.adaptors.items():
             adaptor.unsubscribe(topic)
             self.topics[key].remove(topic)
+        for callback, topics in list(self._subscriber_topics.items()):
+            topics.discard(topic)
+            if not topics:
+                del self._subscriber_topics[callback]
+                self._subscribers.pop(callback, None)
         return True
 
     def publish(self, topic, data=None):
-        """ Publish an event on an topic """
+        """ Publish an event on an topic 
+            Bytes are treated as an already encoded json event 
+            and sent as is. Include a `uuid` when encoding them.
+        """
         if data:
             if isinstance(data, dict):
                 _data = deepcopy(data)
@@ -76,6 +94,9 @@ class EventSystem():
 
     def subscribe_once(self, topic, callback):
         """ Listen to an event once """
+        # Not kept in the cache so the wrapper is freed once the
+        # adaptors drop it. Still shared to dedupe across adaptors.
+        callback = UniqueSubscriber(callback, self.dedupe_size)
         for key, adaptor in self.adaptors.items():
             adaptor.subscribe_once(topic, callback)
         return True
@@ -91,6 +112,15 @@ class EventSystem():
         return self.topics
 
 
+    def _unique(self, callback):
+        """ Wrap a subscriber so it only gets each event uuid once.
+            The same wrapper is reused for a callback across topics 
+            and adaptors to catch an event delivered by both. """
+        subscriber = self._subscribers.get(callback)
+        if subscriber is None:
+            subscriber = self._subscribers[callback] = UniqueSubscriber(callback, self.dedupe_size)
+        return subscriber
+
     def _load_adaptors(self):
         """ Load all the adaptors """
         if self.config:
@@ -101,4 +131,38 @@ class EventSystem():
         else:
             # Default adaptor
             self.adaptors['redis'] = adaptors.Adaptor.adaptors['redis']({"host": "127.0.0.1", "port": 6379})
-            self.topics['redis'] = []
\ No newline at end of file
+            self.topics['redis'] = []
+
+
+class UniqueSubscriber:
+    """ Callback wrapper that drops events with a `uuid` it 
+        already passed on. Recent uuids are kept in a bounded
+        LRU so memory stays fixed. Events without a `uuid` 
+        are always passed on. """
+
+    def __init__(self, callback, size=1024):
+        self.callback = callback
+        self.size = size
+        self.duplicates = 0
+        self._seen = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __call__(self, data):
+        _data = decode_event_data(data) if isinstance(data, bytes) else data
+        if not isinstance(_data, dict):
+            return self.callback(data)
+
+        _uuid = _data.get('uuid')
+        if _uuid is not None:
+            with self._lock:
+                if _uuid in self._seen:
+                    self._seen.move_to_end(_uuid)
+                    self.duplicates += 1
+                    return
+                self._seen[_uuid] = True
+                if len(self._seen) > self.size:
+                    self._seen.popitem(last=False)
+        return self.callback(_data)
+
+    def __repr__(self):
+        return f'<UniqueSubscriber {getattr(self.callback, "__qualname__", self.callback)}>'
@@ -65,6 +65,10 @@ class MQTTAdaptor(Adaptor):
 
     def publish(self, topic, data=None):
         """ Publish an event on the topic """
+        if isinstance(data, bytes):
+            # Already encoded by the publisher
+            return self.connection.publish(topic, data)
+
         if data:
             return self.connection.publish(topic, json.dumps(data))
 
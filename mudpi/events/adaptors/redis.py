@@ -50,6 +50,10 @@ class RedisAdaptor(Adaptor):
 
     def publish(self, topic, data=None):
         """ Publish an event on the topic """
+        if isinstance(data, bytes):
+            # Already encoded by the publisher
+            return self.connection.publish(topic, data)
+
         if data:
             return self.connection.publish(topic, json.dumps(data))
 
@@ -187,7 +187,8 @@ class BaseInterface:
         """
 
         def handle_namespace_action(data=None):
-            """ Wrapper for action call to delegate to components """
+            """ Wrapper for action call to delegate to components.
+                Set `parallel` in data to call many at once. """
             _components = []
             _ids = []
             if data:
@@ -201,25 +202,16 @@ class BaseInterface:
                     if component:
                         _components.append(component)
             else:
-                _components = [ _comp 
-                    for _comp in self.mudpi.components.for_namespace(self.namespace).values() 
-                    if _comp.interface == self.type ]
+                _components = self.mudpi.components.for_interface(self.type, self.namespace)
 
-            for component in _components:
-                try:
-                    func = getattr(component, action)
-                    if callable(func):
-                        if data:
-                            func(data)
-                        else:
-                            func()
-                except Exception as error:
-                    continue
-            return True
+            _parallel = None
+            if isinstance(data, dict) and 'parallel' in data:
+                # Only for the fan out, components get the rest of the data
+                data = dict(data)
+                _parallel = data.pop('parallel')
+            return self.mudpi.actions.fan_out(_components, action, data, _parallel)
 
-        _comps = [ _comp 
-                    for _comp in self.mudpi.components.for_namespace(self.namespace).values() 
-                    if _comp.interface == self.type ]
+        _comps = self.mudpi.components.for_interface(self.type, self.namespace)
 
         for component in _comps:
             try:
@@ -276,9 +268,6 @@ class Component:
         """ Variable suggestion to use for state """
         self._state = None
         
-        """ Keep last event cached to prevent duplicate event fires """
-        self._last_event = {}
-
         # Developer _init so users don't need to call super().init()
         self._init()
 
@@ -327,6 +316,11 @@ class Component:
         """ Classification further describing it, effects the data formatting """
         return None
 
+    @property
+    def expires(self):
+        """ Seconds without a new reading before the state is stale (0 never) """
+        return self.config.get('expires', 0)
+
 
     """ Methods """
     def init(self):
@@ -377,6 +371,13 @@ class Component:
             __init__ instead of using the init() """
         pass
 
+    def state_ttl(self):
+        """ Return the ttl stored with the state. Polled components
+            read a new value each update so every store restarts the
+            expiry. Return None when the state is only a cached value.
+        """
+        return self.expires
+
     def store_state(self):
         """ Stores the current state into the MudPi state managers """
         if self.mudpi is None:
@@ -397,7 +398,7 @@ class Component:
         if self.classifier:
             additional_data.update({'classifier': self.classifier})
 
-        data = self.mudpi.states.set(self.id, self.state, additional_data)
+        data = self.mudpi.states.set(self.id, self.state, additional_data, ttl=self.state_ttl())
 
     def __repr__(self):
         """ Returns the instance representation for debugging. """
@@ -223,11 +223,6 @@ class CharDisplay(Component):
         except Exception as error:
             _event = decode_event_data(event['data'])
 
-        if _event == self._last_event:
-            # Event already handled
-            return
-
-        self._last_event = _event
         if _event is not None:
             try:
                 if _event['event'] == 'Message':
@@ -261,7 +256,4 @@ class CharDisplay(Component):
         # Duration tracking
         self._duration_start = time.perf_counter()
 
-        # Prevent double event fires
-        self._last_event = None
-
         self.mudpi.events.subscribe(self.topic, self.handle_event)
\ No newline at end of file
@@ -0,0 +1,128 @@
+"""
+    Cron Schedule
+    Parses a cron string once into sets of allowed
+    values and computes the next fire time directly.
+
+    Supports `*`, lists `1,15`, ranges `1-5`, steps `*/5` or
+    `10-40/10` and names for months `jan` and weekdays `mon`.
+    Like before all fields must match, including both the
+    day of month and day of week when both are set.
+"""
+import datetime
+from bisect import bisect_left
+from mudpi.exceptions import ConfigError
+
+
+MONTHS = ['jan', 'feb', 'mar', 'apr', 'may', 'jun',
+          'jul', 'aug', 'sep', 'oct', 'nov', 'dec']
+
+WEEKDAYS = ['sun', 'mon', 'tue', 'wed', 'thu', 'fri', 'sat']
+
+# (name, min, max, names) for each field in order
+FIELDS = [
+    ('minute', 0, 59, None),
+    ('hour', 0, 23, None),
+    ('day', 1, 31, None),
+    ('month', 1, 12, { name: index + 1 for index, name in enumerate(MONTHS) }),
+    ('weekday', 0, 7, { name: index for index, name in enumerate(WEEKDAYS) })
+]
+
+# Stop searching if nothing matches (i.e. `0 0 30 feb *`)
+MAX_DAYS = 366 * 5
+
+
+class CronSchedule:
+    """ A parsed cron schedule """
+
+    def __init__(self, expression):
+        self.expression = str(expression).strip()
+        parts = self.expression.split()
+        if len(parts) != 5:
+            raise ConfigError(f'Cron schedule `{self.expression}` needs 5 fields.')
+        self.minutes, self.hours, self.days, self.months, weekdays = [
+            parse_field(part, *field) for part, field in zip(parts, FIELDS) ]
+        # Sunday is 0 or 7
+        self.weekdays = { 0 if day == 7 else day for day in weekdays }
+        self._minutes = sorted(self.minutes)
+        self._hours = sorted(self.hours)
+
+    def matches(self, dt):
+        """ Check if a datetime is in the schedule (to the minute) """
+        return dt.minute in self.minutes and dt.hour in self.hours \
+            and self._day_matches(dt)
+
+    def next_after(self, dt):
+        """ Return the next fire time strictly after `dt` """
+        dt = dt.replace(second=0, microsecond=0) + datetime.timedelta(minutes=1)
+        end = dt + datetime.timedelta(days=MAX_DAYS)
+        while dt < end:
+            if not self._day_matches(dt):
+                dt = dt.replace(hour=0, minute=0) + datetime.timedelta(days=1)
+                continue
+
+            index = bisect_left(self._hours, dt.hour)
+            if index == len(self._hours):
+                dt = dt.replace(hour=0, minute=0) + datetime.timedelta(days=1)
+                continue
+            if self._hours[index] != dt.hour:
+                dt = dt.replace(hour=self._hours[index], minute=0)
+
+            index = bisect_left(self._minutes, dt.minute)
+            if index == len(self._minutes):
+                dt = dt.replace(minute=0) + datetime.timedelta(hours=1)
+                continue
+            return dt.replace(minute=self._minutes[index])
+        raise ConfigError(f'Cron schedule `{self.expression}` never fires.')
+
+    def count_between(self, start, end, limit=1000):
+        """ Number of fire times after `start` up to and including `end` """
+        count = 0
+        dt = self.next_after(start)
+        while dt <= end and count < limit:
+            count += 1
+            dt = self.next_after(dt)
+        return count
+
+    def _day_matches(self, dt):
+        """ Check the month, day of month and day of week """
+        return dt.month in self.months and dt.day in self.days \
+            and (dt.weekday() + 1) % 7 in self.weekdays
+
+    def __repr__(self):
+        return f'<CronSchedule {self.expression}>'
+
+
+def parse_field(value, name, low, high, names=None):
+    """ Return the set of values allowed by a cron field """
+    allowed = set()
+    for part in value.lower().split(','):
+        step = 1
+        if '/' in part:
+            part, _step = part.split('/', 1)
+            step = _to_int(_step, name)
+            if step < 1:
+                raise ConfigError(f'Cron {name} step must be at least 1.')
+
+        if part == '*':
+            start, end = low, high
+        elif '-' in part:
+            start, end = [ _to_int(item, name, names) for item in part.split('-', 1) ]
+        else:
+            start = _to_int(part, name, names)
+            # `5/10` means from 5 to the max every 10
+            end = high if step > 1 else start
+
+        if start < low or end > high or start > end:
+            raise ConfigError(f'Cron {name} `{value}` is outside {low}-{high}.')
+        allowed.update(range(start, end + 1, step))
+    return allowed
+
+
+def _to_int(value, name, names=None):
+    """ Convert a field value or name to an int """
+    if names and value in names:
+        return names[value]
+    try:
+        return int(value)
+    except ValueError:
+        raise ConfigError(f'Invalid cron {name} `{value}`.')
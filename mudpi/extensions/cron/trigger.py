@@ -3,9 +3,8 @@
     Cron schedule support for triggers
     to allow scheduling.
 """
-import time
-import pycron
 import datetime
+from .schedule import CronSchedule
 from mudpi.exceptions import ConfigError
 from mudpi.extensions import BaseInterface
 from mudpi.extensions.trigger import Trigger
@@ -36,6 +35,9 @@ class Interface(BaseInterface):
                     'Trigger: No `schedule`, defaulting to every 5 mins'
                 )
                 # raise ConfigError('Missing `schedule` in Trigger config.')
+            else:
+                # Raises ConfigError if the schedule is invalid
+                CronSchedule(conf['schedule'])
             
         return config
 
@@ -45,32 +47,94 @@ class CronTrigger(Trigger):
         changes based on cron schedule string 
     """
 
+    # Longest wait between checks of the wall clock
+    # so clock changes are noticed within 5 mins
+    MAX_WAIT = 300
+
     """ Properties """
     @property
     def schedule(self):
         """ Cron schedule string to check time against """
         return self.config.get('schedule', '*/5 * * * *')
 
+    @property
+    def catch_up(self):
+        """ Fire once after missing fires i.e. from a suspend """
+        return self.config.get('catch_up', True)
+
+    @property
+    def misfire_grace(self):
+        """ Seconds late a fire can be before it counts as missed """
+        return self.config.get('misfire_grace', 60)
+
+    @property
+    def should_update(self):
+        """ Fires are scheduled with timers instead of polling """
+        return False
+
 
     """ Methods """
     def init(self):
-        """ Pass call to parent """
+        """ Parse the schedule and set the first fire time """
         super().init()
+        self._schedule = CronSchedule(self.schedule)
+        self._timer = None
+        self._active_until = None
+        self._next_fire = self._schedule.next_after(datetime.datetime.now())
+        self._schedule_wake()
+        return True
+
+    def unload(self):
+        """ Stop the scheduled timer """
+        if self._timer is not None:
+            self._timer.cancel()
+        super().unload()
+
+    def _wake(self):
+        """ Fire if the next fire time passed then schedule the next wake """
+        now = datetime.datetime.now()
+        if self._active_until is not None and now >= self._active_until:
+            self._active_until = None
+            self._dispatch(self._set_active, False)
 
-    def check(self):
-        """ Check trigger schedule thresholds """
-        if self.mudpi.is_running:
-            try:
-                if pycron.is_now(self.schedule):
-                    self.trigger()
-                    if not self.active:
-                        self.active = True
-                else:
-                    if self.active:
-                        self.active = False
-            except Exception as error:
+        if now >= self._next_fire:
+            late = (now - self._next_fire).total_seconds()
+            if late > self.misfire_grace:
+                missed = self._schedule.count_between(self._next_fire, now) + 1
                 Logger.log(
-                    LOG_LEVEL["error"],
-                    "Error evaluating time trigger schedule."
+                    LOG_LEVEL["warning"],
+                    f'Cron Trigger {self.id} missed {missed} fire(s) from {self._next_fire}.'
                 )
-        return
\ No newline at end of file
+                if self.catch_up:
+                    self._fire(now)
+            else:
+                self._fire(self._next_fire)
+            self._next_fire = self._schedule.next_after(now)
+        else:
+            # Pick up clock changes that moved the time back
+            self._next_fire = self._schedule.next_after(now)
+        self._schedule_wake(now)
+
+    def _fire(self, fire_time):
+        """ Trigger and stay active for the rest of the minute """
+        self._active_until = fire_time.replace(second=0, microsecond=0) \
+            + datetime.timedelta(minutes=1)
+        self._dispatch(self._set_active, True, self.mudpi.is_running)
+
+    def _set_active(self, active, fire=False):
+        """ Fire actions and update groups off the timer thread """
+        if fire:
+            self.trigger()
+        if self.active != active:
+            self.active = active
+
+    def _schedule_wake(self, now=None):
+        """ Register a timer for the next fire or end of the active minute """
+        now = now or datetime.datetime.now()
+        wake = self._next_fire
+        if self._active_until is not None:
+            wake = min(wake, self._active_until)
+        delay = min(max((wake - now).total_seconds(), 0), self.MAX_WAIT)
+        if self._timer is not None:
+            self._timer.cancel()
+        self._timer = self.mudpi.timers.call_later(delay, self._wake)
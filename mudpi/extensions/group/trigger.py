@@ -3,6 +3,7 @@
     Allows triggers to be grouped
     together for complex conditions.
 """
+import threading
 from mudpi.exceptions import ConfigError
 from mudpi.extensions import BaseInterface
 from mudpi.extensions.trigger import Trigger
@@ -33,6 +34,9 @@ class Interface(BaseInterface):
 class GroupTrigger(Trigger):
     """ A Group to allow complex combintations 
         between multiple trigger types. 
+
+        Triggers notify the group when they are set active
+        so the group keeps a count instead of polling them.
     """
 
     """ Properties """
@@ -42,9 +46,9 @@ class GroupTrigger(Trigger):
         return self.config.get('triggers', [])
 
     @property
-    def trigger_states(self):
-        """ Keys of triggers to group """
-        return [trigger.active for trigger in self._triggers]
+    def should_update(self):
+        """ Groups update when their triggers notify them """
+        return False
 
 
     """ Methods """
@@ -52,6 +56,11 @@ class GroupTrigger(Trigger):
         """ Load in the triggers for the group """
         # List of triggers to monitor
         self._triggers = []
+
+        # Last active value seen from each trigger and how many are active
+        self._trigger_states = {}
+        self._active_count = 0
+        self._count_lock = threading.RLock()
         
         # Doesnt call super().init() because that is for non-groups
         self.cache = self.mudpi.cache.get('trigger', {})
@@ -65,19 +74,23 @@ class GroupTrigger(Trigger):
 
     def add_trigger(self, trigger):
         """ Add a trigger to monitor """
-        self._triggers.append(trigger)
-
-    def check(self):
-        """ Check if trigger should fire """
-        if all(self.trigger_states):
-            self.active = True
-            if self._previous_state != self.active:
-                # Trigger is reset, Fire
-                self.trigger()
-            else:
-                # Trigger not reset check if its multi fire
-                if self.frequency == 'many':
-                    self.trigger()
-        else:
-            self.active = False
-        self._previous_state = self.active
+        with self._count_lock:
+            self._triggers.append(trigger)
+            self._trigger_states[trigger] = bool(trigger.active)
+            self._active_count += int(self._trigger_states[trigger])
+        trigger.add_group(self)
+
+    def trigger_updated(self, trigger, active):
+        """ Called by a trigger each time its `active` is set.
+            Triggers notify while holding their own lock so the
+            values arrive in the order they were set.
+        """
+        with self._count_lock:
+            if self._trigger_states.get(trigger) != active:
+                self._trigger_states[trigger] = active
+                self._active_count += 1 if active else -1
+            self.evaluate_group(bool(self._triggers) and self._active_count >= len(self._triggers))
+
+    def evaluate_group(self, all_active):
+        """ Fire if all triggers are active """
+        self.resolve(all_active, {})
@@ -3,7 +3,6 @@
     Connects to a mqtt to get data 
     from an incoming event. 
 """
-import time
 import json
 from mudpi.utils import decode_event_data
 from mudpi.extensions import BaseInterface
@@ -17,9 +16,6 @@ class Interface(BaseInterface):
     # Override the update interval due to event handling
     update_interval = 1
 
-    # Duration tracking
-    _duration_start = time.perf_counter()
-
     def load(self, config):
         """ Load mqtt sensor component from configs """
         sensor = MQTTSensor(self.mudpi, config)
@@ -77,19 +73,6 @@ class MQTTSensor(Sensor):
         """ Return the topic to listen on for event sensors """
         return str(self.config.get('topic', f'sensor/{self.id}'))
 
-    @property
-    def expires(self):
-        """ Return the time in which state becomes stale """
-        return int(self.config.get('expires', 0))
-
-    @property
-    def expired(self):
-        """ Return if current data is expired """
-        if self.expires > 0:
-            return time.perf_counter() - self._duration_start > self.expires
-        else:
-            return False
-
 
     """ Methods """
     def init(self):
@@ -98,15 +81,11 @@ class MQTTSensor(Sensor):
         # self.update()
         # self.store_state()
         
-        # Track state change
-        self._prev_state = None
-
         # Connection to mqtt
         self._conn = None
 
-        # For duration tracking
-        self._duration_start = time.perf_counter()
-
+        # Set when a message arrives until the state is stored
+        self._new_reading = False
         return True
 
     def connect(self, extension):
@@ -118,33 +97,24 @@ class MQTTSensor(Sensor):
         
     def update(self):
         """ Get data from memory or wait for event """
-        if self._conn:
-            if self.expired:
-                self.mudpi.events.publish('sensor', {
-                    'event': 'StateExpired', 
-                    'component_id': self.id,
-                    'expires': self.expires,
-                    'previous_state': self.state,
-                    'type': self.type})
-                self._state = None
-            if self._prev_state != self._state:
-                self.reset_duration()
-            self._prev_state = self._state
         return self._state
 
+    def state_ttl(self):
+        """ Only restart the expiry if a message arrived since the last store """
+        if not self._new_reading:
+            return None
+        self._new_reading = False
+        return self.expires
+
     def handle_event(self, data={}):
         """ Handle event from mqtt broker """
         if data is not None:
             try:
                 # _event_data = self.last_event = decode_event_data(data)
                 self._state = data
+                self._new_reading = True
             except:
                 Logger.log(
                     LOG_LEVEL["info"],
                     f"Error Decoding Event for MQTT Sensor {self.id}"
                 )
-
-    def reset_duration(self):
-        """ Reset the duration of the current state """
-        self._duration_start = time.perf_counter()
-        return True
\ No newline at end of file
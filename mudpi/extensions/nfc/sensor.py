@@ -228,12 +228,6 @@ class NFCSensor(Sensor):
         """ Process event data for the NFC tag """
         _event_data = decode_event_data(event)
 
-        if _event_data == self._last_event:
-            # Event already handled
-            return
-
-        self._last_event = _event_data
-
         if self.serial:
             if _event_data['tag_id'] != self.serial:
                 return
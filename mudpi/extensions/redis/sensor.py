@@ -3,7 +3,6 @@
     Connects to a redis to get data 
     from state or event. 
 """
-import time
 import json
 import redis
 from mudpi.utils import decode_event_data
@@ -18,9 +17,6 @@ class Interface(BaseInterface):
     # Override the update interval due to event handling
     update_interval = 1
 
-    # Duration tracking
-    _duration_start = time.perf_counter()
-
     def load(self, config):
         """ Load redis sensor component from configs """
         sensor = RedisSensor(self.mudpi, config)
@@ -98,19 +94,6 @@ class RedisSensor(Sensor):
         """ Return the key to get from redis for state sensor """
         return self.config.get('state_key', self.id)
 
-    @property
-    def expires(self):
-        """ Return the time in which state becomes stale """
-        return int(self.config.get('expires', 0))
-
-    @property
-    def expired(self):
-        """ Return if current data is expired """
-        if self.expires > 0:
-            return time.perf_counter() - self._duration_start > self.expires
-        else:
-            return False
-
 
     """ Methods """
     def init(self):
@@ -119,15 +102,11 @@ class RedisSensor(Sensor):
         # self.update()
         # self.store_state()
         
-        # Track state change
-        self._prev_state = None
-
         # Connection to redis
         self._conn = None
 
-        # For duration tracking
-        self._duration_start = time.perf_counter()
-
+        # Set when a new value arrives until the state is stored
+        self._new_reading = False
         return True
 
     def connect(self, connection):
@@ -143,22 +122,23 @@ class RedisSensor(Sensor):
             if self.type == 'state':
                 _data = self._conn.get(self.state_key)
                 if _data:
-                    self._state = _data.decode('utf-8')
+                    _data = _data.decode('utf-8')
+                    # A key can't tell a new write of the same value
+                    # so only a change counts as a new reading
+                    if _data != self._state:
+                        self._state = _data
+                        self._new_reading = True
             else:
                 self.bus.get_message()
-            if self.expired:
-                self.mudpi.events.publish('sensor', {
-                    'event': 'StateExpired', 
-                    'component_id': self.id,
-                    'expires': self.expires,
-                    'previous_state': self.state,
-                    'type': self.type})
-                self._state = None
-            if self._prev_state != self._state:
-                self.reset_duration()
-            self._prev_state = self._state
         return self._state
 
+    def state_ttl(self):
+        """ Only restart the expiry if a value arrived since the last store """
+        if not self._new_reading:
+            return None
+        self._new_reading = False
+        return self.expires
+
     def handle_event(self, event={}):
         """ Handle event from redis pubsub """
         data = decode_event_data(event['data'])
@@ -166,13 +146,9 @@ class RedisSensor(Sensor):
             try:
                 # _event_data = self.last_event = decode_event_data(data)
                 self._state = data
+                self._new_reading = True
             except:
                 Logger.log(
                     LOG_LEVEL["info"],
                     f"Error Decoding Event for Redis Sensor {self.id}"
                 )
-
-    def reset_duration(self):
-        """ Reset the duration of the current state """
-        self._duration_start = time.perf_counter()
-        return True
\ No newline at end of file
@@ -45,50 +45,20 @@ class SensorTrigger(Trigger):
         """ Listen to the sensors state for changes """
         super().init()
 
-        # Used for onetime subscribe
-        self._listening = False
-
         if self.mudpi.is_prepared:
-            if not self._listening:
-                # TODO: Eventually get a handler returned to unsub just this listener
-                self.mudpi.events.subscribe('state', self.handle_event)
-                self._listening = True
+            self.listen('state', 'StateUpdated')
         return True
 
     def handle_event(self, event):
-        """ Handle the event data from the event system """
+        """ Handle the event data passed by the rule engine """
         _event_data = decode_event_data(event)
 
-        if _event_data == self._last_event:
-            # Event already handled
-            return
-
-        self._last_event = _event_data
-        if _event_data.get('event'):
-            try:
-                if _event_data['event'] == 'StateUpdated':
-                    if _event_data['component_id'] == self.source:
-                        sensor_value = self._parse_data(_event_data["new_state"]["state"])
-                        if self.evaluate_thresholds(sensor_value):
-                            self.active = True
-                            if self._previous_state != self.active:
-                                # Trigger is reset, Fire
-                                self.trigger(_event_data)
-                            else:
-                                # Trigger not reset check if its multi fire
-                                if self.frequency == 'many':
-                                    self.trigger(_event_data)
-                        else:
-                            self.active = False
-            except Exception as error:
-                Logger.log(LOG_LEVEL["error"],
-                           f'Error evaluating thresholds for trigger {self.id}')
-                Logger.log(LOG_LEVEL["debug"], error)
-        self._previous_state = self.active
-
-    def unload(self):
-        # Unsubscribe once bus supports single handler unsubscribes
-        return
+        try:
+            self.evaluate(self._parse_data(_event_data["new_state"]["state"]), _event_data)
+        except Exception as error:
+            Logger.log(LOG_LEVEL["error"],
+                       f'Error evaluating thresholds for trigger {self.id}')
+            Logger.log(LOG_LEVEL["debug"], error)
 
     def _parse_data(self, data):
         """ Get nested data if set otherwise return the data """
@@ -376,11 +376,6 @@ class Sequence(Component):
         """ Process event data for the sequence """
         _event_data = decode_event_data(event)
 
-        if _event_data == self._last_event:
-            # Event already handled
-            return
-
-        self._last_event = _event_data
         if _event_data.get('event'):
             try:
                 if _event_data['event'] == 'SequenceNextStep':
@@ -426,9 +421,9 @@ class Sequence(Component):
 
         try:
             for action in self.current_step.get('actions', []):
-                if self.mudpi.actions.exists(action):
-                    _data = value or {}
-                    self.mudpi.actions.call(action, action_data=_data)
+                _plan = self.mudpi.actions.plan(action)
+                if _plan is not None:
+                    _plan(value or {})
         except Exception as e:
             Logger.log(
                 LOG_LEVEL["error"],
@@ -3,12 +3,16 @@
     Monitors state changes and 
     checks new state against any 
     thresholds if provided.
+
+    An `expression` can be used instead of
+    a `source` to check many states at once.
 """
 import json
 from mudpi.utils import decode_event_data
 from mudpi.exceptions import ConfigError
 from mudpi.extensions import BaseInterface
 from mudpi.extensions.trigger import Trigger
+from mudpi.extensions.trigger.expression import Expression
 from mudpi.logger.Logger import Logger, LOG_LEVEL
 
 
@@ -27,8 +31,11 @@ class Interface(BaseInterface):
             config = [config]
 
         for conf in config:
-            if not conf.get('source'):
-                raise ConfigError('Missing `source` key in Sensor Trigger config.')
+            if conf.get('expression'):
+                # Raises ExpressionError if the expression is invalid
+                Expression(conf['expression'])
+            elif not conf.get('source'):
+                raise ConfigError('Missing `source` or `expression` key in State Trigger config.')
             
         return config
 
@@ -39,8 +46,11 @@ class StateTrigger(Trigger):
         matches any thresholds.
     """
 
-    # Used for onetime subscribe
-    _listening = False
+    """ Properties """
+    @property
+    def expression(self):
+        """ Condition over states i.e. `soil < 30 and not raining` """
+        return self.config.get('expression')
 
 
     """ Methods """
@@ -48,50 +58,36 @@ class StateTrigger(Trigger):
         """ Listen to the state for changes """
         super().init()
 
-        # Used for onetime subscribe
-        self._listening = False
+        self._expression = None
+        if self.expression:
+            expression = Expression(self.expression)
+            self._expression = expression.compile(self._state_value, self._window_value)
+            if not self.thresholds:
+                # Without thresholds fire when the expression is true
+                self._thresholds_check = bool
 
         if self.mudpi.is_prepared:
-            if not self._listening:
-                # TODO: Eventually get a handler returned to unsub just this listener
-                self.mudpi.events.subscribe('state', self.handle_event)
-                self._listening = True
+            if self._expression is not None:
+                # Only evaluated when a state in the expression changes
+                for component_id in expression.references:
+                    self.listen('state', 'StateUpdated', component_id)
+            else:
+                self.listen('state', 'StateUpdated')
         return True
 
     def handle_event(self, event):
-        """ Handle the event data from the event system """
+        """ Handle the event data passed by the rule engine """
         _event_data = decode_event_data(event)
 
-        if _event_data == self._last_event:
-            # Event already handled
-            return
-
-        self._last_event = _event_data
-        if _event_data.get('event'):
-            try:
-                if _event_data['event'] == 'StateUpdated':
-                    if _event_data['component_id'] == self.source:
-                        sensor_value = self._parse_data(_event_data["new_state"]["state"])
-                        if self.evaluate_thresholds(sensor_value):
-                            self.active = True
-                            if self._previous_state != self.active:
-                                # Trigger is reset, Fire
-                                self.trigger(_event_data)
-                            else:
-                                # Trigger not reset check if its multi fire
-                                if self.frequency == 'many':
-                                    self.trigger(_event_data)
-                        else:
-                            self.active = False
-            except Exception as error:
-                Logger.log(LOG_LEVEL["error"],
-                           f'Error evaluating thresholds for trigger {self.id}')
-                Logger.log(LOG_LEVEL["debug"], error)
-        self._previous_state = self.active
-
-    def unload(self):
-        # Unsubscribe once bus supports single handler unsubscribes
-        return
+        try:
+            if self._expression is not None:
+                self.evaluate(self._expression_value(), _event_data)
+            else:
+                self.evaluate(self._parse_data(_event_data["new_state"]["state"]), _event_data)
+        except Exception as error:
+            Logger.log(LOG_LEVEL["error"],
+                       f'Error evaluating thresholds for trigger {self.id}')
+            Logger.log(LOG_LEVEL["debug"], error)
 
     def _parse_data(self, data):
         """ Get nested data if set otherwise return the data """
@@ -102,3 +98,24 @@ class StateTrigger(Trigger):
         if isinstance(data, dict):
             return data if not self.nested_source else data.get(self.nested_source, None)
         return data
+
+    def _expression_value(self):
+        """ Evaluate the expression, states that are missing or
+            the wrong type for an operation make it `None` """
+        try:
+            return self._expression()
+        except (TypeError, ZeroDivisionError):
+            return None
+
+    def _state_value(self, component_id):
+        """ Return the parsed state of a component for expressions """
+        state = self.mudpi.states.get(component_id)
+        if state is None:
+            return None
+        data = state.state
+        if isinstance(data, str):
+            try:
+                data = json.loads(data)
+            except Exception as error:
+                pass
+        return data
@@ -1,17 +1,13 @@
 """ 
     Sun Sensor Interface
-    Connects to sun api to get 
-    sunset and sunrise times. 
-    https://sunrise-sunset.org
+    Calculates sunset and sunrise
+    times for a location offline.
 """
-import time
-import json
-import requests
 import datetime
-from mudpi.utils import decode_event_data
 from mudpi.extensions import BaseInterface
 from mudpi.extensions.sensor import Sensor
 from mudpi.exceptions import MudPiError, ConfigError
+from .solar import get_solar_table, noon_elevation, TIME_FORMAT
 
 
 class Interface(BaseInterface):
@@ -51,7 +47,7 @@ class Interface(BaseInterface):
 
 class SunSensor(Sensor):
     """ Sun Sensor
-        Returns a sunrise and sunset from api
+        Returns a sunrise and sunset for the location
     """
 
     """ Properties """
@@ -92,111 +88,58 @@ class SunSensor(Sensor):
             "sunrise": self._sunrise,
             "sunset": self._sunset,
             "solar_noon": self._solar_noon,
+            "dawn": self._dawn,
+            "dusk": self._dusk,
             "day_length": self._day_length,
             "past_sunset": self._past_sunset,
             "past_sunrise": self._past_sunrise,
             "last_update": self._last_update
         }
 
-    @property
-    def duration(self):
-        """ Return how long the current state has been applied in seconds """
-        self._current_duration = time.perf_counter() - self._duration_start
-        return round(self._current_duration, 4)
-
     """ Methods """
-    def restore_state(self, state):
-        """ Retstore state to prevent calls after multiple restarts """
-        self._sunrise = state.state["sunrise"]
-        self._sunset = state.state["sunset"]
-        self._solar_noon = state.state["solar_noon"]
-        self._day_length = state.state["day_length"]
-        try:
-            _last_update = datetime.datetime.strptime(state.state.get("last_update"), '%Y-%m-%d %H:%M:%S')
-            _time = datetime.datetime.now() - _last_update
-            _hours_past = _time.total_seconds() / (60 * 60)
-            if _hours_past < 4:
-                self._data_expired = False
-            self._last_update = _last_update.strftime('%Y-%m-%d %H:%M:%S')
-        except Exception as error:
-            pass
-
-
     def init(self):
         """ Initialize the sun component """
-        # Track state change
-        self._prev_state = {}
-        self._data_expired = True
-        self._sunrise = '00:00:00 AM'
-        self._sunset = '00:00:00 AM'
-        self._solar_noon = '00:00:00 AM'
+        self._table = get_solar_table(self.mudpi, self.latitude, self.longitude)
+        self._date = None
+        self._times = {}
+        self._sunrise = None
+        self._sunset = None
+        self._solar_noon = None
+        self._dawn = None
+        self._dusk = None
         self._day_length = '00:00:00'
         self._past_sunrise = False
         self._past_sunset = False
         self._last_update = None
 
-        # For duration tracking
-        self.reset_duration()
-
     def update(self):
-        """ Get the data for the day """
-        if self.duration > (60 * 60 * 4):
-            self._data_expired = True
-
-        if self._data_expired:
-            _data = self.fetch_data()
-            if _data:
-                self._sunrise = self.parse_time(_data['results']['sunrise'])
-                self._sunset = self.parse_time(_data['results']['sunset'])
-                self._solar_noon = self.parse_time(_data['results']['solar_noon'])
-                self._day_length = _data['results']['day_length']
-                self._data_expired = False
-
+        """ Load times once a day then compare against the parsed times """
         now = datetime.datetime.now()
-        if self._sunrise:
-            try:
-                _parsed_sunrise = datetime.datetime.strptime(self._sunrise, "%Y-%m-%d %I:%M:%S %p")
-                if _parsed_sunrise:
-                    self._past_sunrise = now > _parsed_sunrise
-            except Exception as error:
-                pass
-
-        if self._sunset:
-            try:
-                _parsed_sunset = datetime.datetime.strptime(self._sunset, "%Y-%m-%d %I:%M:%S %p")
-                if _parsed_sunset:
-                    self._past_sunset = now > _parsed_sunset
-            except Exception as error:
-                pass
-
-    def fetch_data(self):
-        """ Make an API request for updated data """
-        url = 'https://api.sunrise-sunset.org/json'
-
-        response = requests.get(url,
-          params={'lat': self.latitude, 'lng': self.longitude},)
-
-        if response.status_code == 200:
-            self.reset_duration()
-            self._last_update = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-            return response.json()
-        elif response.status_code == 404:
-            pass
-        return False
-
-    def parse_time(self, timestamp, time_format="%I:%M:%S %p"):
-        """ Parse a timestring to an object and localize it 
-            Expected format 11:03:10 PM """
-        try:
-            _date = datetime.datetime.strptime(timestamp, time_format)
-            _today = datetime.datetime.now()
-            # _date = _date.replace(day=_today.day, year=_today.year, month=_today.month)
-            _date = _date.replace(tzinfo=datetime.timezone.utc).astimezone(tz=None)
-            return _date.replace(day=_today.day, year=_today.year, month=_today.month).strftime('%Y-%m-%d %I:%M:%S %p')
-        except Exceptio as error:
-            return
-
-    def reset_duration(self):
-        """ Reset the duration of the current state """
-        self._duration_start = time.perf_counter()
-        return self._duration_start
\ No newline at end of file
+        if now.date() != self._date:
+            self.load_day(now.date())
+
+        if self._times.get('sunrise'):
+            self._past_sunrise = now > self._times['sunrise']
+        if self._times.get('sunset'):
+            self._past_sunset = now > self._times['sunset']
+
+    def load_day(self, date):
+        """ Get the sun times of a day from the solar table """
+        self._date = date
+        self._times = self._table.day(date)
+        self._sunrise = self.format_time(self._times['sunrise'])
+        self._sunset = self.format_time(self._times['sunset'])
+        self._solar_noon = self.format_time(self._times['solar_noon'])
+        self._dawn = self.format_time(self._times['dawn'])
+        self._dusk = self.format_time(self._times['dusk'])
+        if self._times['sunrise'] and self._times['sunset']:
+            _seconds = int((self._times['sunset'] - self._times['sunrise']).total_seconds())
+        else:
+            # Polar day or night
+            _seconds = 24 * 60 * 60 if noon_elevation(date, self.latitude, self.longitude) > 0 else 0
+        self._day_length = f'{_seconds // 3600:02}:{_seconds % 3600 // 60:02}:{_seconds % 60:02}'
+        self._last_update = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+
+    def format_time(self, value):
+        """ Format a time like `2021-06-21 05:15:10 AM` """
+        return value.strftime(TIME_FORMAT) if value else None
@@ -0,0 +1,197 @@
+"""
+    Solar Calculator
+    Offline sunrise, sunset, solar noon and twilight times
+    from latitude and longitude using the NOAA solar equations.
+    https://gml.noaa.gov/grad/solcalc/calcdetails.html
+
+    Times for each day are computed once and kept in a table
+    in memory and in a json file so restarts don't redo them.
+"""
+import os
+import json
+import math
+import datetime
+import threading
+from mudpi.logger.Logger import Logger, LOG_LEVEL
+
+
+# Sun zenith angle (degrees) for each event, sunrise and
+# sunset include refraction and the radius of the sun
+ZENITHS = {
+    'sunrise': 90.833,
+    'dawn': 96,
+    'nautical_dawn': 102,
+    'astronomical_dawn': 108,
+}
+
+EVENTS = ['astronomical_dawn', 'nautical_dawn', 'dawn', 'sunrise',
+    'solar_noon', 'sunset', 'dusk', 'nautical_dusk', 'astronomical_dusk']
+
+# Julian day of 0001-01-01 00:00 UTC minus one ordinal day
+JULIAN_OFFSET = 1721424.5
+
+TIME_FORMAT = '%Y-%m-%d %I:%M:%S %p'
+
+
+def julian_century(jd):
+    """ Julian centuries since J2000.0 """
+    return (jd - 2451545) / 36525
+
+
+def sun_position(t):
+    """ Return the sun declination (degrees) and the
+        equation of time (minutes) for a julian century """
+    mean_long = (280.46646 + t * (36000.76983 + t * 0.0003032)) % 360
+    mean_anomaly = math.radians(357.52911 + t * (35999.05029 - 0.0001537 * t))
+    eccentricity = 0.016708634 - t * (0.000042037 + 0.0000001267 * t)
+    center = math.sin(mean_anomaly) * (1.914602 - t * (0.004817 + 0.000014 * t)) \
+        + math.sin(2 * mean_anomaly) * (0.019993 - 0.000101 * t) \
+        + math.sin(3 * mean_anomaly) * 0.000289
+    omega = math.radians(125.04 - 1934.136 * t)
+    apparent_long = math.radians(mean_long + center - 0.00569 - 0.00478 * math.sin(omega))
+    mean_obliquity = 23 + (26 + ((21.448 - t * (46.815 + t * (0.00059 - t * 0.001813)))) / 60) / 60
+    obliquity = math.radians(mean_obliquity + 0.00256 * math.cos(omega))
+    declination = math.degrees(math.asin(math.sin(obliquity) * math.sin(apparent_long)))
+
+    y = math.tan(obliquity / 2) ** 2
+    mean_long = math.radians(mean_long)
+    equation_of_time = 4 * math.degrees(y * math.sin(2 * mean_long)
+        - 2 * eccentricity * math.sin(mean_anomaly)
+        + 4 * eccentricity * y * math.sin(mean_anomaly) * math.cos(2 * mean_long)
+        - 0.5 * y * y * math.sin(4 * mean_long)
+        - 1.25 * eccentricity * eccentricity * math.sin(2 * mean_anomaly))
+    return declination, equation_of_time
+
+
+def hour_angle(latitude, declination, zenith):
+    """ Hour angle (degrees) of the sun at a zenith or
+        None if the sun doesn't reach it that day """
+    latitude = math.radians(latitude)
+    declination = math.radians(declination)
+    cos_angle = math.cos(math.radians(zenith)) / (math.cos(latitude) * math.cos(declination)) \
+        - math.tan(latitude) * math.tan(declination)
+    if cos_angle < -1 or cos_angle > 1:
+        return None
+    return math.degrees(math.acos(cos_angle))
+
+
+def solar_day(date, latitude, longitude):
+    """ Return the sun events of a day as UTC minutes after
+        midnight of the date. Events that don't happen
+        (i.e. polar day or night) are None. """
+    jd = date.toordinal() + JULIAN_OFFSET
+
+    # Solar noon refined once with the sun position at noon
+    noon = 720 - 4 * longitude - sun_position(julian_century(jd + 0.5))[1]
+    declination, equation_of_time = sun_position(julian_century(jd + noon / 1440))
+    noon = 720 - 4 * longitude - equation_of_time
+    minutes = {'solar_noon': noon}
+
+    for event, zenith in ZENITHS.items():
+        setting = event.replace('sunrise', 'sunset').replace('dawn', 'dusk')
+        for name, direction in ((event, -1), (setting, 1)):
+            angle = hour_angle(latitude, declination, zenith)
+            if angle is None:
+                minutes[name] = None
+                continue
+            # Refine with the sun position at the estimated time
+            estimate = noon + direction * 4 * angle
+            _declination, _equation = sun_position(julian_century(jd + estimate / 1440))
+            angle = hour_angle(latitude, _declination, zenith)
+            minutes[name] = None if angle is None \
+                else 720 - 4 * longitude - _equation + direction * 4 * angle
+    return minutes
+
+
+def noon_elevation(date, latitude, longitude):
+    """ Elevation of the sun (degrees) at solar noon """
+    jd = date.toordinal() + JULIAN_OFFSET + 0.5 - longitude / 360
+    return 90 - abs(latitude - sun_position(julian_century(jd))[0])
+
+
+def local_times(date, latitude, longitude):
+    """ Return the sun events of a day as local naive datetimes """
+    midnight = datetime.datetime.combine(date, datetime.time.min, tzinfo=datetime.timezone.utc)
+    times = {}
+    for event, minutes in solar_day(date, latitude, longitude).items():
+        if minutes is None:
+            times[event] = None
+        else:
+            _time = (midnight + datetime.timedelta(minutes=minutes)).astimezone(tz=None)
+            times[event] = _time.replace(tzinfo=None, microsecond=0)
+    return times
+
+
+class SolarTable:
+    """ Per day table of sun times for a location
+
+        Days are computed on first use along with the
+        following `days` and saved to `file` if set.
+    """
+
+    def __init__(self, latitude, longitude, file=None, days=7):
+        self.latitude = float(latitude)
+        self.longitude = float(longitude)
+        self.file = file
+        self.days = days
+        self.location = f'{self.latitude:.4f},{self.longitude:.4f}'
+        self._days = {}
+        self._lock = threading.Lock()
+        self.load()
+
+    def day(self, date=None):
+        """ Return {event: datetime} for a date (Default today) """
+        date = date or datetime.date.today()
+        _key = date.isoformat()
+        times = self._days.get(_key)
+        if times is None:
+            with self._lock:
+                for offset in range(self.days):
+                    _date = date + datetime.timedelta(days=offset)
+                    self._days.setdefault(_date.isoformat(),
+                        local_times(_date, self.latitude, self.longitude))
+                times = self._days[_key]
+                self.save(date)
+        return times
+
+    def load(self):
+        """ Load saved days for this location from the file """
+        if not self.file or not os.path.exists(self.file):
+            return
+        try:
+            with open(self.file) as f:
+                _days = json.load(f).get(self.location, {})
+            for _date, times in _days.items():
+                self._days[_date] = { event: datetime.datetime.fromisoformat(value) if value else None
+                    for event, value in times.items() }
+        except Exception as error:
+            Logger.log(LOG_LEVEL["warning"], f'Unable to load sun table {self.file}. {error}')
+
+    def save(self, today=None):
+        """ Save days from `today` on to the file, older days are dropped """
+        today = (today or datetime.date.today()).isoformat()
+        self._days = { _date: times for _date, times in self._days.items() if _date >= today }
+        if not self.file:
+            return
+        try:
+            data = {}
+            if os.path.exists(self.file):
+                with open(self.file) as f:
+                    data = json.load(f)
+            data[self.location] = { _date: { event: value.isoformat() if value else None
+                for event, value in times.items() } for _date, times in self._days.items() }
+            with open(self.file, 'w') as f:
+                json.dump(data, f)
+        except Exception as error:
+            Logger.log(LOG_LEVEL["warning"], f'Unable to save sun table {self.file}. {error}')
+
+
+def get_solar_table(mudpi, latitude, longitude):
+    """ Return a shared table for a location creating it if needed """
+    tables = mudpi.cache.setdefault('sun', {}).setdefault('tables', {})
+    _key = (round(float(latitude), 4), round(float(longitude), 4))
+    table = tables.get(_key)
+    if table is None:
+        table = tables[_key] = SolarTable(latitude, longitude,
+            mudpi.config.path('sun_table.json'))
+    return table
@@ -1,13 +1,11 @@
 """ 
     Sun Trigger Interface
-    Checks time against sun data
-    to help perform actions based on 
-    the suns position.
+    Schedules actions at sun events
+    like sunrise or sunset with an
+    optional offset.
 """
-import json
-import time
 import datetime
-from mudpi.utils import decode_event_data
+from .solar import get_solar_table, TIME_FORMAT
 from mudpi.exceptions import ConfigError
 from mudpi.extensions import BaseInterface
 from mudpi.extensions.trigger import Trigger
@@ -16,7 +14,7 @@ from mudpi.logger.Logger import Logger, LOG_LEVEL
 
 class Interface(BaseInterface):
 
-    update_interval = 1
+    update_interval = 60
 
     def load(self, config):
         """ Load Trigger component from configs """
@@ -42,6 +40,12 @@ class SunTrigger(Trigger):
         against sun data to perform
         actions based on sun position.
     """
+
+    # Longest wait between checks of the wall clock
+    MAX_WAIT = 300
+
+    # Seconds late a fire can be before it is skipped
+    MISFIRE_GRACE = 60
     
     """ Properties """
     @property
@@ -52,7 +56,7 @@ class SunTrigger(Trigger):
     @property
     def nested_source(self):
         """ Override the nested_source of sun trigger """
-        _types = ['sunset', 'sunrise', 'solar_noon']
+        _types = ['sunset', 'sunrise', 'solar_noon', 'dawn', 'dusk']
         _type = self.config.get('nested_source', None)
         return _type if _type in _types else None
 
@@ -62,61 +66,88 @@ class SunTrigger(Trigger):
         _offset = self.config.get('offset', {})
         return datetime.timedelta(hours=_offset.get('hours',0), minutes=_offset.get('minutes',0), seconds=_offset.get('seconds',0))
 
+    @property
+    def should_update(self):
+        """ Fires are scheduled with timers instead of polling """
+        return False
+
 
     """ Methods """
     def init(self):
-        """ Listen to the sensors state for changes """
+        """ Schedule the first sun event """
         super().init()
-        return True
-
-    def update(self):
-        """ Main update loop to see if trigger should fire """
-        self.check_time()
-
-    def check_time(self):
-        """ Checks the time to see if it is currently sunrise or sunset """
-
-        # Get state object from manager
-        state = self.mudpi.states.get(self.source)
-
-        if state is not None:
-            _state = state.state
+        self._timer = None
+        self._table = None
+        self._next_fire = None
+        self._active_until = None
+        if self.nested_source is None:
+            Logger.log(LOG_LEVEL["warning"],
+                       f'Sun Trigger {self.id} needs a `nested_source` of sunrise, sunset, solar_noon, dawn or dusk.')
         else:
-            _state = None
-
-        if _state:
-            try:
-                _value = self._parse_data(_state)
-                _now = datetime.datetime.now().replace(microsecond=0)
-                if _value:
-                    _value = datetime.datetime.strptime(_value, "%Y-%m-%d %I:%M:%S %p").replace(microsecond=0) + self.offset
-                if _now == _value:
-                    self.active = True
-                    if self._previous_state != self.active:
-                        # Trigger is reset, Fire
-                        self.trigger(_value.strftime('%Y-%m-%d %I:%M:%S %p'))
-                    else:
-                        # Trigger not reset check if its multi fire
-                        if self.frequency == 'many':
-                            self.trigger(_value.strftime('%Y-%m-%d %I:%M:%S %p'))
-                else:
-                    self.active = False
-            except Exception as error:
-                Logger.log(LOG_LEVEL["error"],
-                           f'Error evaluating thresholds for trigger {self.id}')
-                Logger.log(LOG_LEVEL["debug"], error)
-        self._previous_state = self.active
+            self._schedule_wake()
+        return True
 
     def unload(self):
-        # Unsubscribe once bus supports single handler unsubscribes
-        return
-
-    def _parse_data(self, data):
-        """ Get nested data if set otherwise return the data """
-        try:
-            data = json.loads(data)
-        except Exception as error:
-            pass
-        if isinstance(data, dict):
-                return data if not self.nested_source else data.get(self.nested_source, None)
-        return data
\ No newline at end of file
+        """ Stop the scheduled timer """
+        if self._timer is not None:
+            self._timer.cancel()
+        super().unload()
+
+    def next_event(self, now):
+        """ Return the next sun event time plus offset after now """
+        table = self._get_table()
+        for days in range(3):
+            _time = table.day(now.date() + datetime.timedelta(days=days)).get(self.nested_source)
+            if _time is not None and _time + self.offset > now:
+                return _time + self.offset
+        # Sun doesn't rise or set for a while (polar day or night)
+        return None
+
+    def _wake(self):
+        """ Fire if the event time passed then schedule the next wake """
+        now = datetime.datetime.now()
+        if self._active_until is not None and now >= self._active_until:
+            self._active_until = None
+            self._dispatch(self._set_active, False)
+
+        if self._next_fire is not None and now >= self._next_fire:
+            if (now - self._next_fire).total_seconds() <= self.MISFIRE_GRACE:
+                self._active_until = self._next_fire + datetime.timedelta(seconds=1)
+                self._dispatch(self._set_active, True, self._next_fire.strftime(TIME_FORMAT),
+                               self.mudpi.is_running)
+            else:
+                Logger.log(LOG_LEVEL["warning"],
+                           f'Sun Trigger {self.id} missed its fire at {self._next_fire}.')
+        self._schedule_wake(now)
+
+    def _set_active(self, active, value=None, fire=False):
+        """ Update groups and fire actions off the timer thread """
+        self.active = active
+        self._previous_state = active
+        if fire:
+            self.trigger(value)
+
+    def _schedule_wake(self, now=None):
+        """ Register a timer for the next event or end of the active second """
+        now = now or datetime.datetime.now()
+        self._next_fire = self.next_event(now)
+        wake = self._next_fire or now + datetime.timedelta(seconds=self.MAX_WAIT)
+        if self._active_until is not None:
+            wake = min(wake, self._active_until)
+        delay = min(max((wake - now).total_seconds(), 0), self.MAX_WAIT)
+        if self._timer is not None:
+            self._timer.cancel()
+        self._timer = self.mudpi.timers.call_later(delay, self._wake)
+
+    def _get_table(self):
+        """ Use the location of the source sun sensor if loaded """
+        if self._table is None:
+            sensor = self.mudpi.components.get(self.source)
+            if sensor is not None and hasattr(sensor, 'latitude'):
+                self._table = get_solar_table(self.mudpi, sensor.latitude, sensor.longitude)
+            else:
+                # Sensor may not be loaded yet so don't keep this table
+                return get_solar_table(self.mudpi,
+                    self.config.get('latitude', self.mudpi.config.latitude),
+                    self.config.get('longitude', self.mudpi.config.longitude))
+        return self._table
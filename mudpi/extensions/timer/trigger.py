@@ -4,6 +4,7 @@
     configurable elapsed time.
 """
 import time
+import threading
 from . import NAMESPACE
 from mudpi.utils import decode_event_data
 from mudpi.extensions import BaseInterface
@@ -67,12 +68,24 @@ class TimerTrigger(Trigger):
         """ Return if the timer is active or not """
         return self._active
 
+    @active.setter
+    def active(self, value):
+        """ Set if the timer is running and notify groups """
+        with self._active_lock:
+            self._active = bool(value)
+            self._notify_groups(self._active)
+
     @property
     def duration(self):
         if self.active:
-            self.time_elapsed = (time.perf_counter() - self.time_start) + self._pause_offset
+            self.time_elapsed = self._elapsed()
         return round(self.time_elapsed, 2)
 
+    @property
+    def should_update(self):
+        """ Timers fire from a scheduled deadline instead of polling """
+        return False
+
 
     """ Methods """
     def init(self):
@@ -80,8 +93,12 @@ class TimerTrigger(Trigger):
         self._listening = False
         self._active = False
         self.time_elapsed = 0
-        self._last_event = None
         self._pause_offset = 0
+        self._deadline = None
+        self._deadline_id = 0
+        self._deadline_lock = threading.Lock()
+        self.metrics.setdefault('lateness', None)
+        self.metrics.setdefault('max_lateness', 0)
         self.reset_duration()
 
         if self.mudpi.is_prepared:
@@ -90,28 +107,60 @@ class TimerTrigger(Trigger):
                 self.mudpi.events.subscribe(f'{NAMESPACE}/{self.id}', self.handle_event)
                 self._listening = True
 
-    def update(self):
-        """ Get timer data """
-        if self.duration >= self.max_duration:
-            if self.active:
-                self.stop()
-                self.trigger()
-        return True
-
     def reset_duration(self):
         """ Reset the elapsed duration """
         self.time_start = time.perf_counter()
         return self
 
+    def _elapsed(self):
+        """ Seconds elapsed including time before a pause """
+        return (time.perf_counter() - self.time_start) + self._pause_offset
+
+    def _schedule_deadline(self):
+        """ Register a one shot timer for when the duration is reached """
+        with self._deadline_lock:
+            if self._deadline is not None:
+                self._deadline.cancel()
+            self._deadline_id += 1
+            self._deadline = self.mudpi.timers.call_later(
+                self.max_duration - self._elapsed(), self._deadline_reached, self._deadline_id)
+
+    def _cancel_deadline(self):
+        """ Cancel the timer when stopped or paused """
+        with self._deadline_lock:
+            if self._deadline is not None:
+                self._deadline.cancel()
+                self._deadline = None
+            self._deadline_id += 1
+
+    def _deadline_reached(self, deadline_id):
+        """ Scheduler callback to stop the timer and fire """
+        with self._deadline_lock:
+            if deadline_id != self._deadline_id or self._deadline is None:
+                # Stopped, paused or reset while the callback was due
+                return
+            # Seconds the callback ran after the deadline
+            lateness = self._deadline.lateness
+            self._deadline = None
+        if lateness is not None:
+            self.metrics['lateness'] = lateness
+            self.metrics['max_lateness'] = max(self.metrics['max_lateness'], lateness)
+        self._dispatch(self._deadline_fire, deadline_id)
+
+    def _deadline_fire(self, deadline_id):
+        """ Stop the timer and fire off the timer thread """
+        with self._deadline_lock:
+            if deadline_id != self._deadline_id:
+                # Restarted or stopped before the fire ran
+                return
+        if self.active:
+            self.stop()
+            self.trigger()
+
     def handle_event(self, event):
         """ Process event data for the timer """
         _event_data = decode_event_data(event)
 
-        if _event_data == self._last_event:
-            # Event already handled
-            return
-
-        self._last_event = _event_data
         if _event_data.get('event'):
             try:
                 if _event_data['event'] == 'TimerStart':
@@ -159,7 +208,8 @@ class TimerTrigger(Trigger):
                 self.reset()
             else:
                 self.reset_duration()
-            self._active = True
+            self.active = True
+            self._schedule_deadline()
             if self._pause_offset == 0:
                 Logger.log(
                     LOG_LEVEL["debug"],
@@ -175,16 +225,19 @@ class TimerTrigger(Trigger):
     def pause(self, data=None):
         """ Pause the timer """
         if self.active:
-            self._active = False
-            self._pause_offset = self.duration
+            self._pause_offset = self._elapsed()
+            self.time_elapsed = self._pause_offset
+            self._cancel_deadline()
+            self.active = False
             self.reset_duration()
         return self
 
     def stop(self, data=None):
         """ Stop the timer """
         if self.active:
+            self.active = False
+            self._cancel_deadline()
             self.reset()
-            self._active = False
             Logger.log(
                 LOG_LEVEL["debug"],
                 f'Timer Trigger {FONT_MAGENTA}{self.name}{FONT_RESET} Stopped'
@@ -195,6 +248,9 @@ class TimerTrigger(Trigger):
         """ Reset the timer """
         self.reset_duration()
         self._pause_offset = 0
+        if self.active:
+            # Restart the deadline from the reset duration
+            self._schedule_deadline()
         return self
 
     def restart(self, data=None):
@@ -202,3 +258,8 @@ class TimerTrigger(Trigger):
         self.reset()
         self.start()
         return self
+
+    def unload(self):
+        """ Cancel the scheduled deadline """
+        self._cancel_deadline()
+        super().unload()
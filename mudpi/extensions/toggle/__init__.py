@@ -150,11 +150,6 @@ class Toggle(Component):
         except Exception as error:
             _event = decode_event_data(event['data'])
 
-        if _event == self._last_event:
-            # Event already handled
-            return
-
-        self._last_event = _event
         if _event is not None:
             try:
                 if _event['event'] == 'Switch':
@@ -186,8 +181,5 @@ class Toggle(Component):
         # Thread safe bool for if sequence is active
         self._active = threading.Event()
 
-        # Prevent double event fires
-        self._last_event = None
-        
         # Listen for events as well
         self.mudpi.events.subscribe(self.topic, self.handle_event)
\ No newline at end of file
@@ -5,11 +5,18 @@
     be set to define more specific paramerters.
 """
 import json
+import time
 import datetime
+import operator
 import threading
+from mudpi.utils import decode_event_data
 from mudpi.logger.Logger import Logger, LOG_LEVEL
 from mudpi.extensions import Component, BaseExtension
 from mudpi.exceptions import MudPiError
+from mudpi.managers.history_manager import is_number
+from .vector import VectorEngine, NUMPY_ENABLED
+from .window import RollingWindow
+from .expression import Expression
 
 
 NAMESPACE = 'trigger'
@@ -22,6 +29,7 @@ class Extension(BaseExtension):
         self.config = config[self.namespace] #list of lists
         self.cache = self.mudpi.cache.setdefault(NAMESPACE, {})
         trigger_cache = self.cache.setdefault('triggers', {})
+        self.rules = get_rule_engine(self.mudpi)
 
         # Manually load interfaces in order to load group triggers 
         # after all the other triggers because groups depend on 
@@ -81,6 +89,26 @@ class Trigger(Component):
         """ Keys of actions to call if triggered """
         return self.config.get('actions', [])
 
+    @property
+    def hold(self):
+        """ Seconds thresholds must keep passing before firing """
+        return float(self.config.get('hold', 0))
+
+    @property
+    def cooldown(self):
+        """ Minimum seconds between fires """
+        return float(self.config.get('cooldown', 0))
+
+    @property
+    def rate_limit(self):
+        """ Max average fires per second, excess fires are suppressed """
+        return float(self.config.get('rate_limit', 0))
+
+    @property
+    def rate_burst(self):
+        """ Fires allowed at once before `rate_limit` applies """
+        return int(self.config.get('rate_burst', max(1, self.rate_limit)))
+
     @property
     def active(self):
         """ Thread save active boolean """
@@ -89,10 +117,17 @@ class Trigger(Component):
     @active.setter
     def active(self, value):
         """ Allows `self.active = False` while still being thread safe """
-        if value:
-            self._active.set()
-        else:
-            self._active.clear()
+        with self._active_lock:
+            if value:
+                self._active.set()
+            else:
+                self._active.clear()
+            self._notify_groups(bool(value))
+
+    @property
+    def should_update(self):
+        """ Triggers listening through the rule engine aren't polled """
+        return not self._rules
 
 
     """ Methods """
@@ -110,102 +145,49 @@ class Trigger(Component):
 
     def evaluate_thresholds(self, value):
         """ Check if conditions are met to fire trigger """
-        thresholds_passed = False if len(self.thresholds) > 0 else True
-        for threshold in self.thresholds:
-            if threshold.get("type", None) is not None:
-                _type = str(threshold["type"])
-                if _type not in ["int", "float", "str", "datetime", "list", "dict", "json"]:
-                    _type = "int"
-                try:
-                    if _type == "int":
-                        _threshold_value = int(threshold["value"])
-                    if _type == "float":
-                        _threshold_value = float(threshold["value"])
-                    if _type == "str":
-                        _threshold_value = str(threshold["value"])
-                    if _type == "list" or _type == "dict" or _type == "json":
-                        _threshold_value = json.loads(threshold["value"])
-                    if _type == "datetime":
-                        _format = threshold.get("format", "%I:%M %p")
-                        _threshold_value = datetime.datetime.strptime(threshold["value"], _format)
-                except Exception as error:
-                    Logger.log(LOG_LEVEL["error"],
-                       f"Error formatting threshold value to {_type}. \n{error}")
-
-            if threshold.get("source_type", None) is not None:
-                _source_type = str(threshold["source_type"])
-                if _source_type not in ["int", "float", "str", "datetime", "list", "dict", "json"]:
-                    _source_type = "int"
-                try:
-                    if _source_type == "int":
-                        value = int(value)
-                    if _source_type == "float":
-                        value = float(value)
-                    if _source_type == "str":
-                        value = str(value)
-                    if _source_type == "list" or _source_type == "dict" or _source_type == "json":
-                        value = json.loads(value)
-                    if _source_type == "datetime":
-                        _source_format = threshold.get("source_format", "%I:%M %p")
-                        value = datetime.datetime.strptime(value, _source_format)
-                except Exception as error:
-                    Logger.log(LOG_LEVEL["error"],
-                       f"Error formatting threshold value to {_source_type}. \n{error}")
-
-            comparison = threshold.get("comparison", "eq")
-
-            if comparison == "eq" or comparison == "==":
-                if value == threshold["value"]:
-                    thresholds_passed = True
-                else:
-                    thresholds_passed = False
-            elif comparison == "ne" or comparison == "!=":
-                if value != threshold["value"]:
-                    thresholds_passed = True
-                else:
-                    thresholds_passed = False
-            elif comparison == "gt" or comparison == ">":
-                if value > threshold["value"]:
-                    thresholds_passed = True
-                else:
-                    thresholds_passed = False
-            elif comparison == "gte" or comparison == ">=":
-                if value >= threshold["value"]:
-                    thresholds_passed = True
-                else:
-                    thresholds_passed = False
-            elif comparison == "lt" or comparison == "<":
-                if value < threshold["value"]:
-                    thresholds_passed = True
-                else:
-                    thresholds_passed = False
-            elif comparison == "lte" or comparison == "<=":
-                if value <= threshold["value"]:
-                    thresholds_passed = True
-                else:
-                    thresholds_passed = False
-            elif comparison == "ex":
-                if value is not None:
-                    thresholds_passed = True
-                else:
-                    thresholds_passed = False
-            elif comparison == "is":
-                if value is threshold["value"]:
-                    thresholds_passed = True
-                else:
-                    thresholds_passed = False
-            elif comparison == "not":
-                if value is not threshold["value"]:
-                    thresholds_passed = True
-                else:
-                    thresholds_passed = False
-            elif comparison == "in":
-                if value in threshold["value"]:
-                    thresholds_passed = True
-                else:
-                    thresholds_passed = False
-
-        return thresholds_passed
+        return self._thresholds_check(value)
+
+    def evaluate(self, value, data=None):
+        """ Check thresholds and update the trigger with the result """
+        self.resolve(self.evaluate_thresholds(value), data)
+
+    def resolve(self, passed, data=None):
+        """ Fire if the trigger became active or if it fires 
+            `many` times while active. With a `hold` the trigger 
+            only becomes active once `passed` lasts that long. """
+        if passed:
+            if self.hold and not self.active:
+                self._start_hold(data)
+                return
+            self.active = True
+            if self._previous_state != self.active:
+                # Trigger is reset, Fire
+                self.trigger(data)
+            else:
+                # Trigger not reset check if its multi fire
+                if self.frequency == 'many':
+                    self.trigger(data)
+        else:
+            self._cancel_hold()
+            self.active = False
+        self._previous_state = self.active
+
+    def add_group(self, group):
+        """ Notify a group trigger when `active` is set """
+        if group not in self._groups:
+            self._groups.append(group)
+
+    def _notify_groups(self, active):
+        """ Let groups check their triggers """
+        for group in self._groups:
+            group.trigger_updated(self, active)
+
+    def listen(self, topic, event, source=None, field='component_id'):
+        """ Have the rule engine pass `event` on `topic` to 
+            `handle_event()` when `field` matches the source """
+        self._rules = True
+        get_rule_engine(self.mudpi).add(self, topic, event,
+            source if source is not None else self.source, field)
 
     def fire(self, data={}):
         """ Fire an event """
@@ -222,8 +204,30 @@ class Trigger(Component):
 
     def trigger(self, value={}):
         """ Fire off any actions or sequences """
+        with self._fire_lock:
+            _now = time.monotonic()
+            if self.cooldown and self._last_fired is not None \
+                    and _now - self._last_fired < self.cooldown:
+                self.metrics['cooldown'] += 1
+                Logger.log(LOG_LEVEL["debug"],
+                           f"Trigger {self.id} skipped during cooldown.")
+                return
+            if self._rate_limiter is not None and not self._rate_limiter.take():
+                self.metrics['rate_limited'] += 1
+                if self.metrics['rate_limited'] % 100 == 1:
+                    Logger.log(LOG_LEVEL["warning"],
+                               f"Trigger {self.id} is over its rate limit. "
+                               f"{self.metrics['rate_limited']} fires suppressed.")
+                return
+            # Cooldown starts from fires that went through
+            self._last_fired = _now
+            self.metrics['fired'] += 1
+            self.metrics['last_fired'] = time.time()
         try:
             self.fire({'trigger_value': value})
+            # Event data is shared with other triggers so copy before adding action data
+            if isinstance(value, dict):
+                value = dict(value)
             # Trigger the actions of the trigger
             for action in self.actions:
                 if isinstance(action, str):
@@ -236,9 +240,9 @@ class Trigger(Component):
                     if not isinstance(_action_data, dict):
                         _action_data = {'data': _action_data} 
                     value.update(_action_data)
-                if self.mudpi.actions.exists(_action):
-                    _data = value or {}
-                    self.mudpi.actions.call(_action, action_data=_data)
+                _plan = self.mudpi.actions.plan(_action)
+                if _plan is not None:
+                    _plan(value or {})
 
         except Exception as e:
             Logger.log(LOG_LEVEL["error"],
@@ -247,29 +251,403 @@ class Trigger(Component):
 
     def unload(self):
         """ Called during shutdown for cleanup operations """
-        pass
+        self._cancel_hold()
+        if self._rules:
+            get_rule_engine(self.mudpi).remove(self)
 
 
     """ Internal Methods
     Do not override """
+    def _window_value(self, function, component_id, keys=(), seconds=60):
+        """ Return a function that reads a rolling aggregate of a state """
+        window = get_window_store(self.mudpi).window(component_id, keys, seconds)
+        return getattr(window, function)
+
+    def _start_hold(self, data=None):
+        """ Schedule the trigger to activate after `hold` seconds
+            unless the thresholds stop passing before then """
+        with self._hold_lock:
+            # Fire with the latest data once the hold is over
+            self._hold_data = data
+            if self._hold_timer is None:
+                self._hold_timer = self.mudpi.timers.call_later(
+                    self.hold, self._hold_elapsed, self._hold_timer_id)
+
+    def _cancel_hold(self):
+        """ Cancel a pending hold since thresholds stopped passing """
+        with self._hold_lock:
+            if self._hold_timer is not None:
+                self._hold_timer.cancel()
+                self._hold_timer = None
+                self._hold_timer_id += 1
+
+    def _hold_elapsed(self, timer_id):
+        """ Thresholds passed for the whole hold so activate and fire """
+        with self._hold_lock:
+            if self._hold_timer is None or timer_id != self._hold_timer_id:
+                # Hold was cancelled while the timer was running
+                return
+            self._hold_timer = None
+            self._hold_timer_id += 1
+            _data = self._hold_data
+            self._hold_data = None
+        self._dispatch(self._hold_fire, _data)
+
+    def _hold_fire(self, data=None):
+        """ Activate and fire once a hold is over """
+        self.active = True
+        self._previous_state = True
+        self.trigger(data)
+
+    def _dispatch(self, func, *args):
+        """ Run work from a timer callback on the action executor
+            so actions don't delay other timers. Runs in a lane
+            per trigger to keep its fires in order. """
+        _executor = getattr(self.mudpi.actions, 'executor', None)
+        if _executor is None:
+            return func(*args)
+        return _executor.submit(f'trigger:{self.id}', f'trigger.{self.id}', func, *args)
+
     def _init(self):
         """ Set the trigger default settings """
         self._actions = []
 
-        # Used for trigger groups
-        self.group = None
+        # Groups this trigger is part of
+        self._groups = []
 
         # Thread safe active boolean 
         self._active = threading.Event()
+        # Held while setting active and notifying groups
+        self._active_lock = threading.RLock()
 
         # Used to fire triggers `once` or `many`
         self._previous_state = False
 
+        # Set once listening through the rule engine
+        self._rules = False
+
+        # Timer pending while thresholds pass for `hold` seconds
+        self._hold_timer = None
+        self._hold_timer_id = 0
+        self._hold_data = None
+        self._hold_lock = threading.Lock()
+
+        # Monotonic time of the last fire for `cooldown`
+        self._last_fired = None
+        self._fire_lock = threading.Lock()
+
+        # Token bucket to suppress fires over the `rate_limit`
+        self._rate_limiter = TokenBucket(self.rate_limit, self.rate_burst) \
+            if self.rate_limit > 0 else None
+
+        # Thresholds are parsed once into a single check
+        self._thresholds_check = compile_thresholds(self.thresholds, self._window_value)
+        if len(self.thresholds) > 1 and not has_aggregate(self.thresholds):
+            Logger.log(LOG_LEVEL["warning"],
+                       f"Trigger {self.id} has {len(self.thresholds)} thresholds but only the last "
+                       f"is checked. Add an `aggregate` threshold to require all of them.")
+
         # Register Trigger to cache
         self.cache = self.mudpi.cache.setdefault(NAMESPACE, {})
         trigger_cache = self.cache.setdefault('triggers', {})
         trigger_cache[self.id] = self
 
+        # Fire counts, fires skipped by `cooldown` or `rate_limit`
+        # and last fire time (epoch) for the trigger
+        self.metrics = self.mudpi.cache.setdefault('metrics', {}).setdefault('triggers', {}) \
+            .setdefault(self.id, {'fired': 0, 'cooldown': 0, 'rate_limited': 0, 'last_fired': None})
+
+
+class RuleEngine:
+    """ Central dispatch of events to triggers
+
+        Triggers are indexed by topic, event type and source.
+        Each topic is subscribed to once and an event is only
+        passed to the triggers listening for its source, so
+        cost grows with matches instead of total triggers.
+    """
+
+    def __init__(self, mudpi):
+        self.mudpi = mudpi
+        # {topic: {event: {field: {source: [triggers]}}}}
+        self._rules = {}
+        self._lock = threading.RLock()
+        self.metrics = self.mudpi.cache.setdefault('metrics', {}).setdefault('rules', {
+            'events': 0, 'matched': 0
+        })
+        self.vector = None
+        _vectorize = self.mudpi.config.get('mudpi', {}).get('triggers', {}).get('vectorize')
+        if _vectorize:
+            if NUMPY_ENABLED:
+                self.vector = VectorEngine(self.mudpi, self, _vectorize)
+            else:
+                Logger.log(LOG_LEVEL["warning"],
+                   'Vectorized triggers need `numpy` installed. Checking triggers one at a time.')
+
+    def add(self, trigger, topic, event, source, field='component_id'):
+        """ Pass matching events to `trigger.handle_event()` """
+        if self.vector is not None and self.vector.add(trigger, topic, event, source, field):
+            # Numeric thresholds are checked in bulk
+            return
+        with self._lock:
+            if topic not in self._rules:
+                self._rules[topic] = {}
+                self.mudpi.events.subscribe(topic, 
+                    lambda event_data, _topic=topic: self.handle_event(_topic, event_data))
+            _triggers = self._rules[topic].setdefault(event, {}) \
+                .setdefault(field, {}).setdefault(source, [])
+            if trigger not in _triggers:
+                _triggers.append(trigger)
+
+    def remove(self, trigger):
+        """ Stop passing events to the trigger """
+        if self.vector is not None:
+            self.vector.remove(trigger)
+        with self._lock:
+            for events in self._rules.values():
+                for fields in events.values():
+                    for sources in fields.values():
+                        for _triggers in sources.values():
+                            if trigger in _triggers:
+                                _triggers.remove(trigger)
+
+    def triggers_for(self, topic, event_data):
+        """ Return triggers listening for an event """
+        fields = self._rules.get(topic, {}).get(event_data.get('event'))
+        if not fields:
+            return []
+        matched = []
+        for field, sources in fields.items():
+            for trigger in sources.get(event_data.get(field), ()):
+                if trigger not in matched:
+                    matched.append(trigger)
+        return matched
+
+    def handle_event(self, topic, event):
+        """ Dispatch an event to its matching triggers """
+        _event_data = decode_event_data(event)
+        if not isinstance(_event_data, dict):
+            return
+        self.metrics['events'] += 1
+        for trigger in self.triggers_for(topic, _event_data):
+            self.metrics['matched'] += 1
+            try:
+                trigger.handle_event(_event_data)
+            except Exception as error:
+                Logger.log(LOG_LEVEL["error"],
+                   f'Error handling event for trigger {trigger.id}. {error}')
+
+
+class TokenBucket:
+    """ Allows `burst` calls at once refilling at `rate` per second """
+
+    def __init__(self, rate, burst=1):
+        self.rate = float(rate)
+        self.burst = max(1, int(burst))
+        self._tokens = float(self.burst)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def take(self):
+        """ Use a token if one is available """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            if self._tokens < 1:
+                return False
+            self._tokens -= 1
+            return True
+
+
+def get_rule_engine(mudpi):
+    """ Return the shared rule engine creating it if needed """
+    cache = mudpi.cache.setdefault(NAMESPACE, {})
+    rules = cache.get('rules')
+    if rules is None:
+        rules = cache['rules'] = RuleEngine(mudpi)
+    return rules
+
+
+class WindowStore:
+    """ Rolling windows of states shared by triggers
+
+        A window is kept for each state, nested keys and
+        duration used and is updated on `StateUpdated`
+        through the rule engine before triggers check it.
+    """
+
+    def __init__(self, mudpi):
+        self.mudpi = mudpi
+        # {component_id: {(keys, seconds): window}}
+        self._windows = {}
+        self._lock = threading.Lock()
+
+    def window(self, component_id, keys=(), seconds=60):
+        """ Return the window for a state creating it if needed """
+        component_id = component_id.lower()
+        with self._lock:
+            if component_id not in self._windows:
+                self._windows[component_id] = {}
+                get_rule_engine(self.mudpi).add(_WindowListener(self, component_id),
+                    'state', 'StateUpdated', component_id)
+            windows = self._windows[component_id]
+            _key = (tuple(keys), float(seconds))
+            if _key not in windows:
+                windows[_key] = RollingWindow(seconds)
+            return windows[_key]
+
+    def update(self, component_id, state):
+        """ Add a new numeric state to the windows of a component """
+        if isinstance(state, str):
+            try:
+                state = json.loads(state)
+            except Exception as error:
+                pass
+        for (keys, seconds), window in self._windows.get(component_id, {}).items():
+            value = state
+            for key in keys:
+                value = value.get(key) if isinstance(value, dict) else None
+            if is_number(value):
+                window.add(value)
+
+
+class _WindowListener:
+    """ Passes state events from the rule engine to the windows """
+
+    def __init__(self, store, component_id):
+        self.store = store
+        self.id = f'window:{component_id}'
+        self.component_id = component_id
+
+    def handle_event(self, event_data):
+        self.store.update(self.component_id, event_data.get('new_state', {}).get('state'))
+
+
+def get_window_store(mudpi):
+    """ Return the shared window store creating it if needed """
+    cache = mudpi.cache.setdefault(NAMESPACE, {})
+    windows = cache.get('windows')
+    if windows is None:
+        windows = cache['windows'] = WindowStore(mudpi)
+    return windows
+
+
+""" Thresholds """
+COMPARISONS = {
+    'eq': operator.eq, '==': operator.eq,
+    'ne': operator.ne, '!=': operator.ne,
+    'gt': operator.gt, '>': operator.gt,
+    'gte': operator.ge, '>=': operator.ge,
+    'lt': operator.lt, '<': operator.lt,
+    'lte': operator.le, '<=': operator.le,
+    'ex': lambda value, _: value is not None,
+    'is': operator.is_,
+    'not': operator.is_not,
+    'in': lambda value, operand: value in operand
+}
+
+THRESHOLD_TYPES = ["int", "float", "str", "datetime", "list", "dict", "json"]
+
+
+def compile_thresholds(thresholds, aggregate=None):
+    """ Build a function that checks a value against the thresholds.
+        If any threshold has an `aggregate` all of them must pass,
+        otherwise only the last threshold decides like it always has.
+    """
+    thresholds = thresholds or []
+    if not has_aggregate(thresholds):
+        thresholds = thresholds[-1:]
+    checks = [ compile_threshold(threshold, aggregate) for threshold in thresholds ]
+    if not checks:
+        return lambda value: True
+    if len(checks) == 1:
+        return checks[0]
+
+    def check_all(value):
+        for check in checks:
+            if not check(value):
+                return False
+        return True
+    return check_all
+
+
+def has_aggregate(thresholds):
+    """ Return if any threshold compares a rolling aggregate """
+    return any(threshold.get('aggregate') is not None for threshold in thresholds or [])
+
+
+def compile_threshold(threshold, aggregate=None):
+    """ Build a predicate for a threshold with its value coerced
+        to `type` and incoming values coerced to `source_type`.
+
+        An `aggregate` like `avg(temperature, 10m)` is compared
+        instead of the incoming value. `aggregate()` is passed
+        to the expression to read the rolling windows.
+    """
+    operand = threshold.get("value")
+    if threshold.get("type", None) is not None:
+        try:
+            operand = threshold_converter(threshold["type"], threshold.get("format", "%I:%M %p"))(operand)
+        except Exception as error:
+            Logger.log(LOG_LEVEL["error"],
+               f"Error formatting threshold value to {threshold['type']}. \n{error}")
+
+    comparison = COMPARISONS.get(threshold.get("comparison", "eq"))
+    if comparison is None:
+        Logger.log(LOG_LEVEL["error"],
+           f"Unknown threshold comparison {threshold.get('comparison')}.")
+        return lambda value: False
+
+    if threshold.get("aggregate") is not None:
+        read = Expression(threshold["aggregate"]).compile(lambda component_id: None, aggregate)
+
+        def check_aggregate(value):
+            try:
+                return bool(comparison(read(), operand))
+            except (TypeError, ZeroDivisionError):
+                return False
+        return check_aggregate
+
+    if threshold.get("source_type", None) is None:
+        def check(value):
+            try:
+                return bool(comparison(value, operand))
+            except TypeError:
+                return False
+        return check
+
+    _source_type = str(threshold["source_type"])
+    convert = threshold_converter(_source_type, threshold.get("source_format", "%I:%M %p"))
+
+    def check_converted(value):
+        try:
+            value = convert(value)
+        except Exception as error:
+            Logger.log(LOG_LEVEL["error"],
+               f"Error formatting threshold value to {_source_type}. \n{error}")
+        try:
+            return bool(comparison(value, operand))
+        except TypeError:
+            return False
+    return check_converted
+
+
+def threshold_converter(_type, _format="%I:%M %p"):
+    """ Return a function to coerce values to a threshold type """
+    _type = str(_type)
+    if _type not in THRESHOLD_TYPES:
+        _type = "int"
+    if _type == "int":
+        return int
+    if _type == "float":
+        return float
+    if _type == "str":
+        return str
+    if _type == "datetime":
+        return lambda value: datetime.datetime.strptime(value, _format)
+    return json.loads
+
 
 """ Helper """
 def split_trigger_configs(config):
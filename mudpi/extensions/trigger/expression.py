@@ -0,0 +1,273 @@
+"""
+    Trigger Expressions
+    Parses conditions over states such as
+    `soil < 30 and weather.temperature > 25 and not raining`
+    once into a tree that is compiled to closures.
+
+    Names reference a component state by id. Dict states
+    use dots to select a key (i.e. `weather.temperature`).
+    Supports `and`, `or`, `not`, comparisons (== != < <= > >=),
+    arithmetic (+ - * / %), parentheses, numbers, quoted
+    strings and `true`, `false` and `none`.
+
+    Rolling aggregates of a state over a time window can be
+    used with `avg(temperature, 10m)`, `min`, `max` or `delta`.
+"""
+import re
+import operator
+from mudpi.exceptions import ConfigError
+from .window import AGGREGATES, parse_duration
+
+
+class ExpressionError(ConfigError):
+    """ Error parsing a trigger expression. """
+
+
+TOKENS = re.compile(r'''
+    \s*(?:
+        (?P<duration>\d+(?:\.\d+)?[smhd]\b) |
+        (?P<number>\d+\.\d*|\.\d+|\d+) |
+        (?P<string>"[^"]*"|'[^']*') |
+        (?P<name>[A-Za-z_]\w*(?:\.\w+)*) |
+        (?P<op>==|!=|<=|>=|[<>+\-*/%(),])
+    )''', re.VERBOSE)
+
+KEYWORDS = {'and', 'or', 'not', 'true', 'false', 'none'}
+
+CONSTANTS = {'true': True, 'false': False, 'none': None}
+
+COMPARISONS = {
+    '==': operator.eq, '!=': operator.ne,
+    '<': operator.lt, '<=': operator.le,
+    '>': operator.gt, '>=': operator.ge
+}
+
+ARITHMETIC = {
+    '+': operator.add, '-': operator.sub,
+    '*': operator.mul, '/': operator.truediv, '%': operator.mod
+}
+
+
+class Expression:
+    """ A parsed expression
+
+        `tree` is made of tuples:
+            ('const', value), ('ref', component_id, keys),
+            ('not', node), ('neg', node), ('and', left, right),
+            ('or', left, right), ('op', symbol, left, right),
+            ('agg', function, component_id, keys, seconds)
+    """
+
+    def __init__(self, text):
+        self.text = str(text)
+        self.tree = _Parser(tokenize(self.text)).parse()
+        self.references = set(references(self.tree))
+
+    def compile(self, lookup, aggregate=None):
+        """ Return a function that evaluates the expression.
+            `lookup(component_id)` returns the current state.
+            `aggregate(function, component_id, keys, seconds)`
+            returns a function that reads a rolling aggregate.
+        """
+        return compile_node(self.tree, lookup, aggregate)
+
+    def __repr__(self):
+        return f'<Expression {self.text}>'
+
+
+""" Parsing """
+def tokenize(text):
+    """ Split an expression into (kind, value) tokens """
+    tokens = []
+    position = 0
+    text = text.rstrip()
+    while position < len(text):
+        match = TOKENS.match(text, position)
+        if not match or match.end() == position:
+            raise ExpressionError(f'Unexpected `{text[position:].strip()[:10]}` in expression `{text}`')
+        position = match.end()
+        kind = match.lastgroup
+        value = match.group(kind)
+        if kind == 'name' and value.lower() in KEYWORDS:
+            kind, value = 'keyword', value.lower()
+        tokens.append((kind, value))
+    return tokens
+
+
+class _Parser:
+    """ Recursive descent parser from lowest to highest precedence:
+        or, and, not, comparison, + -, * / %, unary -, values
+    """
+
+    def __init__(self, tokens):
+        self.tokens = tokens
+        self.position = 0
+
+    def parse(self):
+        if not self.tokens:
+            raise ExpressionError('Expression is empty')
+        node = self.parse_or()
+        if self.peek() is not None:
+            raise ExpressionError(f'Unexpected `{self.peek()[1]}` in expression')
+        return node
+
+    def peek(self):
+        return self.tokens[self.position] if self.position < len(self.tokens) else None
+
+    def accept(self, *values):
+        token = self.peek()
+        if token is not None and token[0] in ('op', 'keyword') and token[1] in values:
+            self.position += 1
+            return token[1]
+        return None
+
+    def parse_or(self):
+        node = self.parse_and()
+        while self.accept('or'):
+            node = ('or', node, self.parse_and())
+        return node
+
+    def parse_and(self):
+        node = self.parse_not()
+        while self.accept('and'):
+            node = ('and', node, self.parse_not())
+        return node
+
+    def parse_not(self):
+        if self.accept('not'):
+            return ('not', self.parse_not())
+        return self.parse_comparison()
+
+    def parse_comparison(self):
+        node = self.parse_sum()
+        symbol = self.accept(*COMPARISONS)
+        if symbol is None:
+            return node
+        right = self.parse_sum()
+        node = ('op', symbol, node, right)
+        # Chained comparisons like `10 < temp < 30`
+        symbol = self.accept(*COMPARISONS)
+        while symbol is not None:
+            left, right = right, self.parse_sum()
+            node = ('and', node, ('op', symbol, left, right))
+            symbol = self.accept(*COMPARISONS)
+        return node
+
+    def parse_sum(self):
+        node = self.parse_product()
+        symbol = self.accept('+', '-')
+        while symbol is not None:
+            node = ('op', symbol, node, self.parse_product())
+            symbol = self.accept('+', '-')
+        return node
+
+    def parse_product(self):
+        node = self.parse_unary()
+        symbol = self.accept('*', '/', '%')
+        while symbol is not None:
+            node = ('op', symbol, node, self.parse_unary())
+            symbol = self.accept('*', '/', '%')
+        return node
+
+    def parse_unary(self):
+        if self.accept('-'):
+            return ('neg', self.parse_unary())
+        return self.parse_value()
+
+    def parse_value(self):
+        token = self.peek()
+        if token is None:
+            raise ExpressionError('Expression ended unexpectedly')
+        kind, value = token
+        if self.accept('('):
+            node = self.parse_or()
+            if not self.accept(')'):
+                raise ExpressionError('Missing `)` in expression')
+            return node
+        self.position += 1
+        if kind == 'number':
+            return ('const', float(value) if '.' in value else int(value))
+        if kind == 'string':
+            return ('const', value[1:-1])
+        if kind == 'keyword' and value in CONSTANTS:
+            return ('const', CONSTANTS[value])
+        if kind == 'name' and value.lower() in AGGREGATES and self.accept('('):
+            return self.parse_aggregate(value.lower())
+        if kind == 'name':
+            parts = value.split('.')
+            return ('ref', parts[0].lower(), tuple(parts[1:]))
+        raise ExpressionError(f'Unexpected `{value}` in expression')
+
+    def parse_aggregate(self, function):
+        """ Parse the `(state, window)` of an aggregate like `avg(temp, 10m)` """
+        token = self.peek()
+        if token is None or token[0] != 'name':
+            raise ExpressionError(f'`{function}()` needs a state i.e. `{function}(temperature, 10m)`')
+        self.position += 1
+        parts = token[1].split('.')
+        if not self.accept(','):
+            raise ExpressionError(f'`{function}()` needs a window i.e. `{function}({token[1]}, 10m)`')
+        window = self.peek()
+        if window is None or window[0] not in ('duration', 'number'):
+            raise ExpressionError(f'Invalid window for `{function}()`')
+        self.position += 1
+        if not self.accept(')'):
+            raise ExpressionError(f'Missing `)` after `{function}()`')
+        return ('agg', function, parts[0].lower(), tuple(parts[1:]), parse_duration(window[1]))
+
+
+def references(node):
+    """ Generator of component ids used in an expression tree """
+    if node[0] == 'ref':
+        yield node[1]
+    elif node[0] == 'agg':
+        yield node[2]
+    elif node[0] in ('not', 'neg'):
+        yield from references(node[1])
+    elif node[0] in ('and', 'or'):
+        yield from references(node[1])
+        yield from references(node[2])
+    elif node[0] == 'op':
+        yield from references(node[2])
+        yield from references(node[3])
+
+
+""" Compiling """
+def compile_node(node, lookup, aggregate=None):
+    """ Build a closure for an expression tree node """
+    kind = node[0]
+    if kind == 'const':
+        value = node[1]
+        return lambda: value
+    if kind == 'ref':
+        return _compile_ref(node[1], node[2], lookup)
+    if kind == 'agg':
+        if aggregate is None:
+            raise ExpressionError(f'`{node[1]}()` is not supported here')
+        return aggregate(*node[1:])
+    if kind == 'not':
+        operand = compile_node(node[1], lookup, aggregate)
+        return lambda: not operand()
+    if kind == 'neg':
+        operand = compile_node(node[1], lookup, aggregate)
+        return lambda: -operand()
+    left = compile_node(node[-2], lookup, aggregate)
+    right = compile_node(node[-1], lookup, aggregate)
+    if kind == 'and':
+        return lambda: left() and right()
+    if kind == 'or':
+        return lambda: left() or right()
+    func = COMPARISONS.get(node[1]) or ARITHMETIC[node[1]]
+    return lambda: func(left(), right())
+
+
+def _compile_ref(component_id, keys, lookup):
+    """ Closure to read a state and any nested keys """
+    def value():
+        data = lookup(component_id)
+        for key in keys:
+            if not isinstance(data, dict):
+                return None
+            data = data.get(key)
+        return data
+    return value
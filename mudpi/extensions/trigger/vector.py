@@ -0,0 +1,278 @@
+"""
+    Vectorized Thresholds
+    Optional engine that packs numeric thresholds of
+    state triggers into NumPy arrays and checks every
+    trigger affected by a batch of state changes at once.
+
+    Enable with `mudpi.triggers.vectorize` (requires numpy):
+        {"vectorize": {"batch_interval": 0.01}}
+    State changes within `batch_interval` seconds are
+    checked together (Default 0, check each change).
+"""
+import json
+import threading
+from mudpi.logger.Logger import Logger, LOG_LEVEL
+from mudpi.managers.history_manager import is_number
+
+try:
+    import numpy as np
+    NUMPY_ENABLED = True
+except ImportError:
+    NUMPY_ENABLED = False
+
+
+# Comparison codes stored in the threshold arrays
+CODES = {
+    'eq': 0, '==': 0,
+    'ne': 1, '!=': 1,
+    'gt': 2, '>': 2,
+    'gte': 3, '>=': 3,
+    'lt': 4, '<': 4,
+    'lte': 5, '<=': 5
+}
+
+NUMERIC_TYPES = (None, 'int', 'float')
+
+
+class VectorEngine:
+    """ Checks numeric thresholds of many triggers in one pass
+
+        Each threshold is a row of (operand, comparison code,
+        value index, trigger index). A value index points to the
+        parsed value of a (source, nested_source, source_type).
+        Once/many firing is decided from the pass masks.
+    """
+
+    def __init__(self, mudpi, rules, config=None):
+        self.mudpi = mudpi
+        self.rules = rules
+        self.config = config if isinstance(config, dict) else {}
+        self.batch_interval = float(self.config.get('batch_interval', 0))
+        self._triggers = []
+        self._thresholds = {}
+        self._value_keys = {}
+        self._sources = {}
+        self._pending = {}
+        self._timer = None
+        self._dirty = True
+        self._lock = threading.RLock()
+        self.metrics = self.mudpi.cache.setdefault('metrics', {}).setdefault('vector_rules', {
+            'batches': 0, 'changes': 0, 'triggers': 0
+        })
+
+    def add(self, trigger, topic, event, source, field='component_id'):
+        """ Take over a trigger if all its thresholds are numeric.
+            Returns False if the trigger should be handled normally.
+        """
+        if topic != 'state' or event != 'StateUpdated' or field != 'component_id':
+            return False
+        thresholds = numeric_thresholds(trigger)
+        if thresholds is None:
+            return False
+
+        with self._lock:
+            if trigger in self._thresholds:
+                return True
+            self._triggers.append(trigger)
+            self._thresholds[trigger] = thresholds
+            self._value_keys[trigger] = (source, trigger.nested_source or None,
+                trigger.thresholds[-1].get('source_type'))
+            if source not in self._sources:
+                self._sources[source] = []
+                self.rules.add(_SourceListener(self, source), 'state', 'StateUpdated', source)
+            self._sources[source].append(trigger)
+            self._dirty = True
+        return True
+
+    def remove(self, trigger):
+        """ Stop checking a trigger """
+        with self._lock:
+            if trigger in self._thresholds:
+                self._triggers.remove(trigger)
+                del self._thresholds[trigger]
+                _source = self._value_keys.pop(trigger)[0]
+                self._sources[_source].remove(trigger)
+                self._dirty = True
+
+    def update(self, source, event_data):
+        """ Queue a state change to be checked """
+        with self._lock:
+            self._pending[source] = event_data
+            if self.batch_interval <= 0:
+                _flush = True
+            else:
+                _flush = False
+                if self._timer is None:
+                    self._timer = self.mudpi.timers.call_later(self.batch_interval, self.flush, True)
+        if _flush:
+            self.flush()
+
+    def flush(self, dispatch=False):
+        """ Check all triggers for the queued state changes.
+            From the batch timer `dispatch` hands each trigger to
+            the action executor so actions don't delay other timers.
+        """
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            self._timer = None
+            if not pending:
+                return
+            if self._dirty:
+                self._build()
+
+            _sources = [ source for source in pending if source in self._source_rows ]
+            if not _sources:
+                return
+            for source in _sources:
+                _state = pending[source].get('new_state', {}).get('state')
+                for value_index in self._source_values[source]:
+                    self._values[value_index] = parse_value(_state, *self._value_list[value_index][1:])
+
+            rows = np.concatenate([ self._source_rows[source] for source in _sources ])
+            triggers = np.unique(np.concatenate([ self._source_triggers[source] for source in _sources ]))
+
+            values = self._values[self._row_values[rows]]
+            passed_rows = compare(values, self._row_operands[rows], self._row_codes[rows])
+            failed = np.bincount(self._row_triggers[rows][~passed_rows], minlength=len(self._triggers))
+            passed = failed[triggers] == 0
+
+            # Edge detection on the masks for once / many
+            previous = self._active[triggers]
+            fire = passed & (~previous | self._many[triggers])
+            self._active[triggers] = passed
+
+            self.metrics['batches'] += 1
+            self.metrics['changes'] += len(_sources)
+            self.metrics['triggers'] += len(triggers)
+            _updates = [ (self._triggers[index], bool(active), bool(_fire),
+                pending[self._value_keys[self._triggers[index]][0]])
+                for index, active, _fire in zip(triggers, passed, fire) ]
+
+        for trigger, active, _fire, event_data in _updates:
+            if dispatch:
+                trigger._dispatch(apply_result, trigger, active, _fire, event_data)
+            else:
+                apply_result(trigger, active, _fire, event_data)
+
+    def _build(self):
+        """ Pack thresholds into arrays grouped by source """
+        value_keys = list(dict.fromkeys(self._value_keys[trigger] for trigger in self._triggers))
+        value_index = { key: index for index, key in enumerate(value_keys) }
+        trigger_index = { trigger: index for index, trigger in enumerate(self._triggers) }
+
+        rows = [ (trigger_index[trigger], value_index[self._value_keys[trigger]], code, operand)
+            for trigger in self._triggers
+            for code, operand in self._thresholds[trigger] ]
+        self._row_triggers = np.array([ row[0] for row in rows ], dtype=np.intp)
+        self._row_values = np.array([ row[1] for row in rows ], dtype=np.intp)
+        self._row_codes = np.array([ row[2] for row in rows ], dtype=np.int8)
+        self._row_operands = np.array([ row[3] for row in rows ], dtype=np.float64)
+
+        self._value_list = value_keys
+        self._values = np.full(len(value_keys), np.nan)
+        self._active = np.array([ bool(trigger._previous_state) for trigger in self._triggers ], dtype=bool)
+        self._many = np.array([ trigger.frequency == 'many' for trigger in self._triggers ], dtype=bool)
+
+        _row_sources = [ value_keys[row[1]][0] for row in rows ]
+        self._source_rows = {}
+        self._source_triggers = {}
+        self._source_values = {}
+        for source, triggers in self._sources.items():
+            if not triggers:
+                continue
+            self._source_rows[source] = np.array([ index
+                for index, row_source in enumerate(_row_sources) if row_source == source ], dtype=np.intp)
+            self._source_triggers[source] = np.array([ trigger_index[trigger] for trigger in triggers ], dtype=np.intp)
+            self._source_values[source] = [ index
+                for index, key in enumerate(value_keys) if key[0] == source ]
+        self._dirty = False
+
+
+class _SourceListener:
+    """ Receives events for a source from the rule engine """
+
+    def __init__(self, engine, source):
+        self.engine = engine
+        self.id = f'vector:{source}'
+        self.source = source
+
+    def handle_event(self, event_data):
+        self.engine.update(self.source, event_data)
+
+
+""" Helpers """
+def apply_result(trigger, active, fire, event_data):
+    """ Set a trigger active from a check and fire it if needed """
+    trigger.active = active
+    trigger._previous_state = active
+    if not fire:
+        return
+    try:
+        trigger.trigger(event_data)
+    except Exception as error:
+        Logger.log(LOG_LEVEL["error"],
+           f'Error firing vectorized trigger {trigger.id}. {error}')
+
+
+def numeric_thresholds(trigger):
+    """ Return [(code, operand)] if the threshold a trigger checks
+        is a numeric comparison otherwise None """
+    thresholds = getattr(trigger, 'thresholds', None)
+    if not thresholds or getattr(trigger, '_expression', None) is not None \
+            or not hasattr(trigger, '_parse_data') or getattr(trigger, 'hold', 0) \
+            or any(threshold.get('aggregate') is not None for threshold in thresholds):
+        return None
+    # Without aggregates only the last threshold is checked
+    thresholds = thresholds[-1:]
+    if thresholds[0].get('source_type') not in NUMERIC_TYPES:
+        return None
+
+    rows = []
+    for threshold in thresholds:
+        code = CODES.get(threshold.get('comparison', 'eq'))
+        if code is None or threshold.get('type') not in NUMERIC_TYPES:
+            return None
+        operand = threshold.get('value')
+        try:
+            if threshold.get('type') == 'int':
+                operand = int(operand)
+            elif threshold.get('type') == 'float':
+                operand = float(operand)
+        except (TypeError, ValueError):
+            return None
+        if not is_number(operand):
+            return None
+        rows.append((code, operand))
+    return rows
+
+
+def parse_value(state, nested_source=None, source_type=None):
+    """ Parse a state to a float like the triggers do, NaN if not numeric """
+    if isinstance(state, str):
+        try:
+            state = json.loads(state)
+        except Exception:
+            pass
+    if isinstance(state, dict):
+        state = state.get(nested_source) if nested_source else state
+    try:
+        if source_type == 'int':
+            state = int(state)
+        elif source_type == 'float':
+            state = float(state)
+    except (TypeError, ValueError):
+        return np.nan
+    # Bools compare as numbers like they do in python
+    return float(state) if isinstance(state, (int, float)) else np.nan
+
+
+def compare(values, operands, codes):
+    """ Apply the comparison for each row. NaN only passes `ne`
+        which matches comparing a number to a non-numeric state. """
+    passed = np.zeros(len(values), dtype=bool)
+    for code, func in enumerate((np.equal, np.not_equal, np.greater,
+            np.greater_equal, np.less, np.less_equal)):
+        mask = codes == code
+        if mask.any():
+            passed[mask] = func(values[mask], operands[mask])
+    return passed
@@ -0,0 +1,105 @@
+"""
+    Rolling Windows
+    Incremental aggregates of a numeric state over
+    a time window used by `avg()`, `min()`, `max()`
+    and `delta()` in trigger thresholds and expressions.
+
+    Each value is added once and dropped once it leaves
+    the window so updates and reads are O(1) amortized.
+"""
+import re
+import time
+import threading
+from collections import deque
+from mudpi.exceptions import ConfigError
+
+
+AGGREGATES = ('avg', 'min', 'max', 'delta')
+
+UNITS = {'s': 1, 'm': 60, 'h': 60 * 60, 'd': 24 * 60 * 60}
+
+DURATION = re.compile(r'^(\d+(?:\.\d+)?)\s*([smhd]?)$')
+
+
+def parse_duration(value):
+    """ Convert `30s`, `10m`, `1h`, `1d` or seconds to seconds """
+    match = DURATION.match(str(value).strip().lower())
+    if not match:
+        raise ConfigError(f'Invalid window duration `{value}`. Use i.e. `30s`, `10m` or `1h`.')
+    seconds = float(match.group(1)) * UNITS.get(match.group(2) or 's')
+    if seconds <= 0:
+        raise ConfigError(f'Window duration `{value}` must be more than 0.')
+    return seconds
+
+
+class RollingWindow:
+    """ Running sum, min and max of values from the last `seconds`
+
+        Min and max use monotonic deques so the oldest
+        entry is always the current min or max.
+    """
+
+    def __init__(self, seconds):
+        self.seconds = float(seconds)
+        self._values = deque()
+        self._min = deque()
+        self._max = deque()
+        self._sum = 0
+        self._lock = threading.Lock()
+
+    def add(self, value, now=None):
+        """ Add a value to the window """
+        now = time.monotonic() if now is None else now
+        with self._lock:
+            self._values.append((now, value))
+            self._sum += value
+            while self._min and self._min[-1][1] >= value:
+                self._min.pop()
+            self._min.append((now, value))
+            while self._max and self._max[-1][1] <= value:
+                self._max.pop()
+            self._max.append((now, value))
+            self._evict(now)
+
+    def avg(self):
+        """ Average of the values in the window """
+        with self._lock:
+            self._evict()
+            return self._sum / len(self._values) if self._values else None
+
+    def min(self):
+        """ Lowest value in the window """
+        with self._lock:
+            self._evict()
+            return self._min[0][1] if self._min else None
+
+    def max(self):
+        """ Highest value in the window """
+        with self._lock:
+            self._evict()
+            return self._max[0][1] if self._max else None
+
+    def delta(self):
+        """ Change from the oldest to the newest value in the window """
+        with self._lock:
+            self._evict()
+            return self._values[-1][1] - self._values[0][1] if self._values else None
+
+    def __len__(self):
+        return len(self._values)
+
+    def _evict(self, now=None):
+        """ Drop values older than the window """
+        cutoff = (time.monotonic() if now is None else now) - self.seconds
+        while self._values and self._values[0][0] < cutoff:
+            self._sum -= self._values.popleft()[1]
+        while self._min and self._min[0][0] < cutoff:
+            self._min.popleft()
+        while self._max and self._max[0][0] < cutoff:
+            self._max.popleft()
+        if not self._values:
+            # Reset to clear any float error from the running sum
+            self._sum = 0
+
+    def __repr__(self):
+        return f'<RollingWindow {self.seconds}s ({len(self._values)} values)>'
@@ -0,0 +1,227 @@
+"""
+MudPi Action Executor
+
+Runs action calls on a bounded pool of threads so slow
+actions don't block the event bus. Calls for the same
+target run one at a time in the order they were made.
+"""
+import time
+import threading
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor, wait, FIRST_COMPLETED
+
+from mudpi.exceptions import MudPiError
+from mudpi.logger.Logger import Logger, LOG_LEVEL
+
+
+class ActionExecutor:
+    """ Thread pool with a serial lane per target
+
+        Config (`mudpi.actions`):
+            `workers`    - Threads running actions (Default 4)
+            `queue_size` - Max calls waiting before new calls
+                           are rejected (Default 1000)
+            `parallel`   - Components called at once by namespace
+                           actions (Default 1, one at a time)
+            `fan_out_workers` - Threads shared by namespace
+                           actions (Default 16)
+    """
+
+    def __init__(self, mudpi, config=None):
+        self.mudpi = mudpi
+        self.config = config or {}
+        self.workers = max(int(self.config.get('workers', 4)), 1)
+        self.queue_size = int(self.config.get('queue_size', 1000))
+        self._pool = ThreadPoolExecutor(self.workers, thread_name_prefix='action')
+        # Separate pool so fan out calls can't starve the lanes they run in
+        self.parallel = max(int(self.config.get('parallel', 1)), 1)
+        self._fan_out_pool = ThreadPoolExecutor(max(int(self.config.get('fan_out_workers', 16)), 1),
+            thread_name_prefix='action_fan_out')
+        self._lanes = {}
+        self._pending = 0
+        self._lock = threading.Lock()
+        self.metrics = self.mudpi.cache.setdefault('metrics', {}).setdefault('actions', {})
+
+    def submit(self, lane, name, func, *args):
+        """ Queue a call behind others in the same lane.
+            `lane` can be a list of lanes for calls that touch
+            many targets, the call waits for all of them.
+            Returns a Future with the result of the call.
+        """
+        lanes = tuple(dict.fromkeys(lane)) if isinstance(lane, (list, tuple, set, frozenset)) else (lane,)
+        future = Future()
+        job = _Job(future, name, func, args, lanes)
+        with self._lock:
+            if self._pending >= self.queue_size:
+                future.set_exception(MudPiError(f"Action queue is full, dropped call to {name}"))
+                Logger.log(LOG_LEVEL["warning"],
+                   f"Action Queue Full ({self.queue_size}), Dropped Call to {name}")
+                return future
+            self._pending += 1
+            for _lane in lanes:
+                self._lanes.setdefault(_lane, deque()).append(job)
+            if not self._ready(job):
+                # Lanes are already being drained by a worker
+                return future
+            job.started = True
+        try:
+            self._pool.submit(self._drain, job)
+        except RuntimeError as error:
+            # Pool was shutdown
+            self._reject(job, error)
+        return future
+
+    def _ready(self, job):
+        """ Check if a job is first in all its lanes """
+        return all(self._lanes[lane][0] is job for lane in job.lanes)
+
+    def _finish(self, job):
+        """ Remove a job from its lanes and return jobs
+            that are now first in all their lanes """
+        ready = []
+        for lane in job.lanes:
+            lane_queue = self._lanes[lane]
+            lane_queue.popleft()
+            if not lane_queue:
+                del self._lanes[lane]
+                continue
+            _next = lane_queue[0]
+            if not _next.started and self._ready(_next):
+                _next.started = True
+                ready.append(_next)
+        return ready
+
+    def _drain(self, job):
+        """ Run a job and the jobs waiting on its lanes """
+        while job is not None:
+            with self._lock:
+                self._pending -= 1
+
+            if job.future.set_running_or_notify_cancel():
+                started_at = time.perf_counter()
+                try:
+                    job.future.set_result(job.func(*job.args))
+                except Exception as error:
+                    Logger.log(LOG_LEVEL["error"],
+                       f"Error Running Action {job.name}. {error}")
+                    job.future.set_exception(error)
+                self._record(job.name, started_at - job.queued_at, time.perf_counter() - started_at,
+                    job.future.exception() is not None)
+
+            with self._lock:
+                ready = self._finish(job)
+            # Keep running one lane on this worker and hand off the rest
+            job = ready.pop(0) if ready else None
+            for _job in ready:
+                try:
+                    self._pool.submit(self._drain, _job)
+                except RuntimeError as error:
+                    self._reject(_job, error)
+
+    def _reject(self, job, error):
+        """ Fail a job the pool wouldn't take and release its lanes.
+            Jobs waiting on those lanes can't be handed off either. """
+        rejected = [job]
+        while rejected:
+            job = rejected.pop()
+            with self._lock:
+                self._pending -= 1
+                rejected.extend(self._finish(job))
+            job.future.set_exception(error)
+
+    def _record(self, name, queue_time, run_time, failed=False):
+        """ Track call timings per action """
+        with self._lock:
+            metric = self.metrics.get(name)
+            if metric is None:
+                metric = self.metrics[name] = {
+                    'calls': 0, 'failed': 0,
+                    'queue_time': 0.0, 'max_queue_time': 0.0,
+                    'run_time': 0.0, 'max_run_time': 0.0
+                }
+            metric['calls'] += 1
+            metric['failed'] += int(failed)
+            metric['queue_time'] += queue_time
+            metric['run_time'] += run_time
+            metric['max_queue_time'] = max(metric['max_queue_time'], queue_time)
+            metric['max_run_time'] = max(metric['max_run_time'], run_time)
+
+    def fan_out(self, components, action, data=None, parallel=None):
+        """ Call an action on many components at once """
+        return fan_out(components, action, data,
+            parallel if parallel is not None else self.parallel, self._fan_out_pool)
+
+    @property
+    def pending(self):
+        """ Number of calls waiting to run """
+        return self._pending
+
+    def shutdown(self, wait=False):
+        """ Stop accepting calls and cancel waiting ones """
+        with self._lock:
+            for lane_queue in self._lanes.values():
+                for job in lane_queue:
+                    job.future.cancel()
+        self._pool.shutdown(wait=wait)
+        self._fan_out_pool.shutdown(wait=wait)
+
+
+class _Job:
+    """ A queued call and the lanes it runs in """
+
+    __slots__ = ('future', 'name', 'func', 'args', 'lanes', 'queued_at', 'started')
+
+    def __init__(self, future, name, func, args, lanes):
+        self.future = future
+        self.name = name
+        self.func = func
+        self.args = args
+        self.lanes = lanes
+        self.queued_at = time.perf_counter()
+        self.started = False
+
+
+""" Helper """
+def fan_out(components, action, data=None, parallel=1, pool=None):
+    """ Call the `action` method on each component with up to
+        `parallel` calls running at a time on the `pool`.
+        Returns the result or error of each component with timings.
+    """
+    _start = time.perf_counter()
+    components = list(components)
+    parallel = max(int(parallel or 1), 1)
+    results = {}
+
+    if parallel == 1 or pool is None or len(components) < 2:
+        for component in components:
+            results[component.id] = _call_component(component, action, data)
+    else:
+        running = {}
+        for component in components:
+            if len(running) >= parallel:
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    results[running.pop(future)] = future.result()
+            running[pool.submit(_call_component, component, action, data)] = component.id
+        for future in running:
+            results[running[future]] = future.result()
+
+    return {
+        'components': results,
+        'failed': len([ result for result in results.values() if 'error' in result ]),
+        'parallel': parallel,
+        'duration': round(time.perf_counter() - _start, 4)
+    }
+
+
+def _call_component(component, action, data=None):
+    """ Call an action method on a component capturing errors """
+    _start = time.perf_counter()
+    try:
+        func = getattr(component, action, None)
+        if not callable(func):
+            return {'skipped': True, 'duration': 0}
+        result = func(data) if data else func()
+        return {'result': result, 'duration': round(time.perf_counter() - _start, 4)}
+    except Exception as error:
+        return {'error': str(error), 'duration': round(time.perf_counter() - _start, 4)}
@@ -0,0 +1,52 @@
+class StateBackend:
+	""" Base backend for storing states between restarts """
+
+	# This key should represent the `mudpi.states.backend` config value
+	key = None
+
+	backends = {}
+
+	def __init_subclass__(cls, **kwargs):
+		super().__init_subclass__(**kwargs)
+		cls.backends[cls.key] = cls
+
+	def __init__(self, manager, config={}):
+		self.manager = manager
+		self.config = config
+
+	def connect(self):
+		""" Open connections or files needed for storage """
+		raise NotImplementedError()
+
+	def load(self):
+		""" Return a tuple of the last version and a list
+			of encoded states saved from the previous run """
+		raise NotImplementedError()
+
+	def save(self, state, is_new=False):
+		""" Store a state, `is_new` is set for new ids """
+		raise NotImplementedError()
+
+	def remove(self, ids):
+		""" Remove states for a list of component ids """
+		raise NotImplementedError()
+
+	def get_value(self, key):
+		""" Get a stored value used for MudPi data like caches """
+		raise NotImplementedError()
+
+	def set_value(self, key, value):
+		""" Store a value used for MudPi data like caches """
+		raise NotImplementedError()
+
+	""" No need to override these unless necessary """
+	def flush(self):
+		""" Write any buffered changes """
+		pass
+
+	def close(self):
+		""" Flush and close any connections """
+		self.flush()
+
+# Import backends
+from . import memory, sqlite, redis
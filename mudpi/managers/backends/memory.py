@@ -0,0 +1,33 @@
+from . import StateBackend
+
+
+class MemoryBackend(StateBackend):
+    """ Keep states in memory only. Nothing is
+        saved between restarts and no server is needed. """
+    key = 'memory'
+
+    def connect(self):
+        """ Nothing to connect to """
+        self.values = {}
+        return True
+
+    def load(self):
+        """ Memory is empty on each run """
+        return (0, [])
+
+    def save(self, state, is_new=False):
+        """ States already live in the manager """
+        return True
+
+    def remove(self, ids):
+        """ States already live in the manager """
+        return True
+
+    def get_value(self, key):
+        """ Get a value stored this run """
+        return self.values.get(key)
+
+    def set_value(self, key, value):
+        """ Store a value for this run """
+        self.values[key] = value
+        return True
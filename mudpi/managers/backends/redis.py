@@ -0,0 +1,126 @@
+import json
+import redis
+import threading
+from . import StateBackend
+from mudpi.logger.Logger import Logger, LOG_LEVEL
+from mudpi.constants import STATE_LAYOUT_KEYS, STATE_LAYOUT_HASH, REDIS_STATES_HASH, \
+    REDIS_STATES_SET, REDIS_STATE_VERSION, REDIS_STATE_VERSIONS
+
+
+class RedisBackend(StateBackend):
+    """ Store states in redis to share them with the frontend
+
+        Layouts (`mudpi.states.layout`):
+        `keys` - One `<id>.state` key per state and a json
+                 `state_keys` list. (Default)
+        `hash` - All states in one `mudpi:states` hash with
+                 ids tracked in a `mudpi:state_keys` set.
+    """
+    key = 'redis'
+
+    def connect(self):
+        """ Make redis connection """
+        self.layout = str(self.config.get('layout', STATE_LAYOUT_KEYS)).lower()
+        if self.layout not in (STATE_LAYOUT_KEYS, STATE_LAYOUT_HASH):
+            Logger.log(LOG_LEVEL["warning"],
+               f"State Manager Unknown Layout {self.layout}, Using `{STATE_LAYOUT_KEYS}`")
+            self.layout = STATE_LAYOUT_KEYS
+        host = self.config.get('host', '127.0.0.1')
+        port = self.config.get('port', 6379)
+        password = self.config.get('password')
+        self.connection = redis.Redis(host=host, port=port, password=password)
+        # Highest version written, saves can arrive out of order
+        self._version = 0
+        self._lock = threading.Lock()
+        return True
+
+    def load(self):
+        """ Fetch all states in bulk (HGETALL or MGET) to keep the
+            number of round trips constant no matter how many states. """
+        if self.layout == STATE_LAYOUT_HASH:
+            self.migrate_layout()
+
+        pipe = self.connection.pipeline(transaction=False)
+        pipe.get(REDIS_STATE_VERSION)
+        if self.layout == STATE_LAYOUT_HASH:
+            pipe.hgetall(REDIS_STATES_HASH)
+            version, stored = pipe.execute()
+            stored = list(stored.values())
+        else:
+            pipe.get('state_keys')
+            version, keys = pipe.execute()
+            keys = json.loads(keys) if keys else []
+            stored = self.connection.mget([f'{key}.state' for key in keys]) if keys else []
+        self._version = max(self._version, int(version) if version else 0)
+        return (self._version, [data for data in stored if data])
+
+    def save(self, state, is_new=False):
+        """ Write a state using the configured layout """
+        pipe = self.connection.pipeline(transaction=False)
+        if self.layout == STATE_LAYOUT_HASH:
+            pipe.hset(REDIS_STATES_HASH, state.component_id, state.to_json())
+            if is_new:
+                pipe.sadd(REDIS_STATES_SET, state.component_id)
+        else:
+            pipe.set(f'{state.component_id}.state', state.to_json())
+            if is_new:
+                # The key list only changes when a new id is added
+                pipe.set('state_keys', json.dumps(self.manager.ids()))
+        pipe.zadd(REDIS_STATE_VERSIONS, {state.component_id: state.version})
+        # Writes are ordered by the lock so the stored version only goes up
+        with self._lock:
+            if state.version > self._version:
+                self._version = state.version
+                pipe.set(REDIS_STATE_VERSION, state.version)
+            pipe.execute()
+        return True
+
+    def remove(self, ids):
+        """ Remove a batch of states with a single write """
+        pipe = self.connection.pipeline(transaction=False)
+        if self.layout == STATE_LAYOUT_HASH:
+            pipe.hdel(REDIS_STATES_HASH, *ids)
+            pipe.srem(REDIS_STATES_SET, *ids)
+        else:
+            pipe.delete(*[f'{_id}.state' for _id in ids])
+            pipe.set('state_keys', json.dumps(self.manager.ids()))
+        pipe.zrem(REDIS_STATE_VERSIONS, *ids)
+        pipe.execute()
+        return True
+
+    def get_value(self, key):
+        """ Get a value from redis """
+        return self.connection.get(key)
+
+    def set_value(self, key, value):
+        """ Store a value in redis """
+        return self.connection.set(key, value)
+
+    def migrate_layout(self):
+        """ Move states stored as `<id>.state` keys into the `mudpi:states`
+            hash. Old keys are removed once copied so this only runs once.
+        """
+        keys = self.connection.get('state_keys')
+        if not keys:
+            return 0
+
+        keys = json.loads(keys)
+        stored = self.connection.mget([f'{key}.state' for key in keys]) if keys else []
+        pipe = self.connection.pipeline(transaction=True)
+        migrated = 0
+        for key, data in zip(keys, stored):
+            if data:
+                pipe.hset(REDIS_STATES_HASH, key, data)
+                pipe.sadd(REDIS_STATES_SET, key)
+                migrated += 1
+            pipe.delete(f'{key}.state')
+        pipe.delete('state_keys')
+        pipe.execute()
+
+        Logger.log(LOG_LEVEL["info"],
+           f"State Manager Migrated {migrated} States to `{REDIS_STATES_HASH}`")
+        return migrated
+
+    def close(self):
+        """ Close the redis connection """
+        self.connection.close()
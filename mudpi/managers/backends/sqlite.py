@@ -0,0 +1,139 @@
+import time
+import sqlite3
+import threading
+from . import StateBackend
+from mudpi.logger.Logger import Logger, LOG_LEVEL
+
+
+class SQLiteBackend(StateBackend):
+    """ Store states in a local SQLite database
+
+        Uses WAL mode and buffers changes to write them
+        in batched transactions. Only the latest state per
+        component is written each batch. Buffered changes
+        are written within `flush_interval` by a core timer.
+    """
+    key = 'sqlite'
+
+    def connect(self):
+        """ Open the database and prepare tables """
+        self.path = self.config.get('path') or self.manager.mudpi.config.path('mudpi_states.db')
+        # Seconds or number of states to buffer before writing
+        self.flush_interval = float(self.config.get('flush_interval', 1))
+        self.flush_size = int(self.config.get('flush_size', 100))
+
+        self._pending = {}
+        self._last_flush = time.monotonic()
+        self._timer = None
+        self._lock = threading.RLock()
+        # Only set once the database is ready so a failed connect
+        # leaves the backend unusable instead of half open
+        self.connection = None
+        connection = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        connection.execute('PRAGMA journal_mode=WAL')
+        connection.execute('PRAGMA synchronous=NORMAL')
+        connection.execute('CREATE TABLE IF NOT EXISTS states '
+            '(component_id TEXT PRIMARY KEY, data BLOB NOT NULL, version INTEGER NOT NULL DEFAULT 0)')
+        connection.execute('CREATE TABLE IF NOT EXISTS mudpi_values '
+            '(key TEXT PRIMARY KEY, value BLOB)')
+        self.connection = connection
+        return True
+
+    def load(self):
+        """ Read all the stored states in one query """
+        if not self.connected:
+            return (0, [])
+        with self._lock:
+            rows = self.connection.execute('SELECT data, version FROM states ORDER BY version').fetchall()
+        version = max((row[1] for row in rows), default=0)
+        return (version, [row[0] for row in rows])
+
+    def save(self, state, is_new=False):
+        """ Buffer the state until the next batch """
+        if not self.connected:
+            return False
+        with self._lock:
+            self._pending[state.component_id] = (state.component_id, state.to_json(), state.version)
+            _should_flush = len(self._pending) >= self.flush_size or \
+                time.monotonic() - self._last_flush >= self.flush_interval
+            if not _should_flush and self._timer is None:
+                self._timer = self.manager.mudpi.timers.call_later(self.flush_interval, self._flush_later)
+        if _should_flush:
+            self.flush()
+        return True
+
+    def remove(self, ids):
+        """ Delete states in one transaction """
+        if not self.connected:
+            return False
+        with self._lock:
+            for _id in ids:
+                self._pending.pop(_id, None)
+            with self.connection:
+                self.connection.execute('BEGIN')
+                self.connection.executemany('DELETE FROM states WHERE component_id = ?',
+                    [(_id,) for _id in ids])
+        return True
+
+    def get_value(self, key):
+        """ Get a stored value """
+        if not self.connected:
+            return None
+        with self._lock:
+            row = self.connection.execute('SELECT value FROM mudpi_values WHERE key = ?', (key,)).fetchone()
+        return row[0] if row else None
+
+    def set_value(self, key, value):
+        """ Store a value """
+        if not self.connected:
+            return False
+        with self._lock:
+            self.connection.execute('INSERT OR REPLACE INTO mudpi_values (key, value) VALUES (?, ?)', (key, value))
+        return True
+
+    def flush(self):
+        """ Write buffered states in a single transaction """
+        if not self.connected:
+            return 0
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            self._last_flush = time.monotonic()
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if not pending:
+                return 0
+            try:
+                with self.connection:
+                    self.connection.execute('BEGIN')
+                    self.connection.executemany('INSERT OR REPLACE INTO states '
+                        '(component_id, data, version) VALUES (?, ?, ?)', pending.values())
+            except sqlite3.Error as error:
+                Logger.log(LOG_LEVEL["error"],
+                   f"State Manager SQLite Write Failed. {error}")
+                return 0
+        return len(pending)
+
+    def _flush_later(self):
+        """ Timer callback, the write runs off the timer thread """
+        with self._lock:
+            self._timer = None
+        _executor = getattr(self.manager.mudpi.actions, 'executor', None)
+        if _executor is not None:
+            _executor.submit('state:sqlite', 'state.sqlite_flush', self.flush)
+        else:
+            self.flush()
+
+    @property
+    def connected(self):
+        """ Return if the database was opened """
+        return getattr(self, 'connection', None) is not None
+
+    def close(self):
+        """ Write remaining states and close the database """
+        if not self.connected:
+            return
+        self.flush()
+        with self._lock:
+            self.connection.close()
+            self.connection = None
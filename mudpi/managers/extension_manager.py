@@ -167,7 +167,8 @@ class ExtensionManager:
         """
 
         def handle_namespace_action(data=None):
-            """ Wrapper for action call to delegate to components """
+            """ Wrapper for action call to delegate to components.
+                Set `parallel` in data to call many at once. """
             _components = []
             _ids = []
             if data:
@@ -183,17 +184,12 @@ class ExtensionManager:
             else:
                 _components = self.mudpi.components.for_namespace(self.namespace).values()
 
-            for component in _components:
-                try:
-                    func = getattr(component, action)
-                    if callable(func):
-                        if data:
-                            func(data)
-                        else:
-                            func()
-                except Exception as error:
-                    continue
-            return True
+            _parallel = None
+            if isinstance(data, dict) and 'parallel' in data:
+                # Only for the fan out, components get the rest of the data
+                data = dict(data)
+                _parallel = data.pop('parallel')
+            return self.mudpi.actions.fan_out(_components, action, data, _parallel)
 
         for component in self.mudpi.components.for_namespace(self.namespace).values():
             try:
@@ -0,0 +1,148 @@
+"""
+MudPi History Manager
+
+Keeps a short in-memory history of numeric states so
+triggers and displays can look back at recent data
+without making any IO calls to redis or a database.
+"""
+import time
+import datetime
+import threading
+from array import array
+from bisect import bisect_left
+from mudpi.constants import CLASSIFIERS
+
+
+class HistoryManager:
+    """ Recent numeric history for each component state
+
+        Each component gets a fixed size ring buffer per
+        value it tracks. Plain numeric states are stored
+        as is and dict states (i.e. DHT `temperature`)
+        store the configured `keys`.
+    """
+
+    def __init__(self, config=None):
+        self.config = config or {}
+        self.size = int(self.config.get('size', 360))
+        self.keys = set(self.config.get('keys', CLASSIFIERS))
+        self.series = {}
+        self._lock = threading.RLock()
+
+    def record(self, component_id, state, timestamp=None):
+        """ Store the numeric values of a state """
+        timestamp = timestamp or time.time()
+        values = numeric_values(state, self.keys)
+        if not values:
+            return False
+
+        with self._lock:
+            for key, value in values:
+                buffer = self.series.get((component_id, key))
+                if buffer is None:
+                    buffer = self.series[(component_id, key)] = RingBuffer(self.size)
+                buffer.append(timestamp, value)
+        return True
+
+    def get(self, component_id, since=None, key=None):
+        """ Return a list of [timestamp, value] pairs
+            `since` can be an epoch timestamp or datetime
+        """
+        buffer = self.series.get((component_id, key))
+        if buffer is None:
+            return []
+        if isinstance(since, datetime.datetime):
+            since = since.timestamp()
+        with self._lock:
+            return buffer.since(since)
+
+    def keys_for(self, component_id):
+        """ Return the keys tracked for a component """
+        return [ key for _id, key in self.series if _id == component_id ]
+
+    def remove(self, component_id):
+        """ Drop all history for a component """
+        with self._lock:
+            for series_key in [ key for key in self.series if key[0] == component_id ]:
+                del self.series[series_key]
+
+
+class RingBuffer:
+    """ Fixed capacity buffer of timestamped floats
+        backed by arrays to keep memory use flat.
+    """
+
+    __slots__ = ('capacity', 'times', 'values', 'start', 'count')
+
+    def __init__(self, capacity):
+        self.capacity = max(int(capacity), 1)
+        self.times = array('d', bytes(8 * self.capacity))
+        self.values = array('d', bytes(8 * self.capacity))
+        self.start = 0
+        self.count = 0
+
+    def append(self, timestamp, value):
+        """ Add a value overwriting the oldest once full """
+        if self.count < self.capacity:
+            index = (self.start + self.count) % self.capacity
+            self.count += 1
+        else:
+            index = self.start
+            self.start = (self.start + 1) % self.capacity
+        self.times[index] = timestamp
+        self.values[index] = value
+
+    def since(self, timestamp=None):
+        """ Return entries newer or equal to timestamp oldest first """
+        first = 0
+        if timestamp is not None:
+            first = bisect_left(_OrderedView(self), timestamp)
+        return [ [self.times[index], self.values[index]]
+            for index in (
+                (self.start + offset) % self.capacity
+                for offset in range(first, self.count)
+            ) ]
+
+    def latest(self):
+        """ Return the newest entry """
+        if not self.count:
+            return None
+        index = (self.start + self.count - 1) % self.capacity
+        return [self.times[index], self.values[index]]
+
+    def __len__(self):
+        return self.count
+
+
+class _OrderedView:
+    """ Sequence view over ring buffer timestamps for bisect """
+
+    __slots__ = ('buffer',)
+
+    def __init__(self, buffer):
+        self.buffer = buffer
+
+    def __len__(self):
+        return self.buffer.count
+
+    def __getitem__(self, offset):
+        buffer = self.buffer
+        return buffer.times[(buffer.start + offset) % buffer.capacity]
+
+
+""" Helpers """
+def numeric_values(state, keys):
+    """ Return (key, value) pairs of numeric values in a state.
+        Dict states only return values for the given keys.
+    """
+    if isinstance(state, dict):
+        return [ (key, value) for key, value in state.items()
+            if key in keys and is_number(value) ]
+    elif is_number(state):
+        return [(None, state)]
+    return []
+
+
+def is_number(value):
+    """ Check for numeric values excluding bools """
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
@@ -0,0 +1,370 @@
+"""
+MudPi History Store
+
+Persists numeric state history to disk in compressed
+append-only segment files. Built to keep days of sensor
+data on an SD card while writing as little as possible.
+
+Segment Layout:
+    Each segment file covers a fixed window of time and is
+    named by its start time `<epoch>.seg`. Data is appended
+    in blocks, one block per series for each flush.
+
+    Block: [payload length][crc32][name length][name][payload]
+    Payload: [count][first timestamp ms][first value]
+             then for each point after the first:
+             [delta-of-delta timestamp][xor encoded value]
+
+    Values are XOR'd with the previous value and only the
+    meaningful bytes are kept. Unchanged values cost one byte.
+"""
+import os
+import time
+import zlib
+import struct
+import datetime
+import threading
+from mudpi.constants import CLASSIFIERS
+from mudpi.logger.Logger import Logger, LOG_LEVEL
+from mudpi.managers.history_manager import numeric_values
+
+
+SEGMENT_EXTENSION = '.seg'
+BLOCK_HEADER = struct.Struct('>IIH')
+
+
+class HistoryStore:
+    """ On-disk time series store for state history
+
+        Appends are buffered in memory and written in batches
+        with one fsync per segment touched to reduce SD card
+        write amplification. Segments older than `retention`
+        are deleted as new segments are started.
+
+        A partial block left at the end of a segment by a power
+        loss is truncated before the segment is appended to so
+        new blocks are not written after unreadable data.
+    """
+
+    def __init__(self, path, config=None):
+        self.path = path
+        self.config = config or {}
+        self.keys = set(self.config.get('keys', CLASSIFIERS))
+        # Seconds of data to keep on disk (Default 7 days)
+        self.retention = int(self.config.get('retention', 60 * 60 * 24 * 7))
+        # Seconds of data covered by each segment file
+        self.segment_duration = int(self.config.get('segment_duration', 60 * 60 * 6))
+        # Write buffered points after this many seconds or points
+        self.flush_interval = float(self.config.get('flush_interval', 300))
+        self.flush_size = int(self.config.get('flush_size', 1000))
+
+        self._pending = {}
+        self._pending_count = 0
+        self._last_flush = time.monotonic()
+        self._last_segment = None
+        # Segments checked for partial blocks since starting
+        self._checked = set()
+        self._lock = threading.RLock()
+        os.makedirs(self.path, exist_ok=True)
+
+    def record(self, component_id, state, timestamp=None):
+        """ Buffer the numeric values of a state for writing """
+        values = numeric_values(state, self.keys)
+        if not values:
+            return False
+
+        timestamp_ms = int((timestamp or time.time()) * 1000)
+        with self._lock:
+            for key, value in values:
+                self._pending.setdefault(series_name(component_id, key), []) \
+                    .append((timestamp_ms, float(value)))
+            self._pending_count += len(values)
+            _should_flush = self._pending_count >= self.flush_size or \
+                time.monotonic() - self._last_flush >= self.flush_interval
+        if _should_flush:
+            self.flush()
+        return True
+
+    def flush(self):
+        """ Write all buffered points to their segments """
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            self._pending_count = 0
+            self._last_flush = time.monotonic()
+            if not pending:
+                return 0
+
+            # Group blocks per segment so each file is opened once
+            segments = {}
+            for name, points in pending.items():
+                _current = []
+                _segment = None
+                for point in points:
+                    point_segment = self.segment_start(point[0] / 1000)
+                    if point_segment != _segment and _current:
+                        segments.setdefault(_segment, []).append(encode_block(name, _current))
+                        _current = []
+                    _segment = point_segment
+                    _current.append(point)
+                if _current:
+                    segments.setdefault(_segment, []).append(encode_block(name, _current))
+
+            written = 0
+            for segment, blocks in segments.items():
+                try:
+                    if segment not in self._checked:
+                        repair_segment(self.segment_path(segment))
+                        self._checked.add(segment)
+                    with open(self.segment_path(segment), 'ab') as file:
+                        file.write(b''.join(blocks))
+                        file.flush()
+                        os.fsync(file.fileno())
+                    written += len(blocks)
+                except OSError as error:
+                    Logger.log(LOG_LEVEL["error"],
+                       f"History Store Failed Writing Segment {segment}. {error}")
+
+            _newest = max(segments)
+            if _newest != self._last_segment:
+                self._last_segment = _newest
+                self.apply_retention()
+        return written
+
+    def scan(self, component_id, start=None, end=None, key=None):
+        """ Stream (timestamp, value) pairs for a series in a time range.
+            `start` and `end` can be epoch timestamps or datetimes.
+        """
+        name = series_name(component_id, key)
+        start = _to_timestamp(start)
+        end = _to_timestamp(end)
+        start_ms = int(start * 1000) if start is not None else None
+        end_ms = int(end * 1000) if end is not None else None
+
+        for segment in self.segments():
+            if start is not None and segment + self.segment_duration <= start:
+                continue
+            if end is not None and segment > end:
+                break
+            for timestamp, value in read_segment(self.segment_path(segment), name):
+                if start_ms is not None and timestamp < start_ms:
+                    continue
+                if end_ms is not None and timestamp > end_ms:
+                    continue
+                yield (timestamp / 1000, value)
+
+        # Include data that has not been written yet
+        with self._lock:
+            pending = list(self._pending.get(name, []))
+        for timestamp, value in pending:
+            if start_ms is not None and timestamp < start_ms:
+                continue
+            if end_ms is not None and timestamp > end_ms:
+                continue
+            yield (timestamp / 1000, value)
+
+    def segments(self):
+        """ Return start times of segments on disk oldest first """
+        starts = []
+        for file in os.listdir(self.path):
+            if file.endswith(SEGMENT_EXTENSION):
+                try:
+                    starts.append(int(file[:-len(SEGMENT_EXTENSION)]))
+                except ValueError:
+                    continue
+        return sorted(starts)
+
+    def apply_retention(self, now=None):
+        """ Delete segments that are entirely older than retention """
+        cutoff = (now or time.time()) - self.retention
+        removed = 0
+        for segment in self.segments():
+            if segment + self.segment_duration > cutoff:
+                break
+            try:
+                os.remove(self.segment_path(segment))
+                self._checked.discard(segment)
+                removed += 1
+            except OSError:
+                continue
+        return removed
+
+    def segment_start(self, timestamp):
+        """ Return the start time of the segment for a timestamp """
+        return int(timestamp // self.segment_duration * self.segment_duration)
+
+    def segment_path(self, segment):
+        """ Return the file path for a segment start time """
+        return os.path.join(self.path, f'{segment}{SEGMENT_EXTENSION}')
+
+    def close(self):
+        """ Write any buffered data before shutdown """
+        return self.flush()
+
+
+""" Encoding """
+def encode_block(name, points):
+    """ Compress a list of (timestamp_ms, value) points into a block """
+    payload = bytearray()
+    _write_varint(payload, len(points))
+    first_time, first_value = points[0]
+    _write_varint(payload, _zigzag(first_time))
+    payload += struct.pack('>d', first_value)
+
+    previous_time = first_time
+    previous_delta = 0
+    previous_bits = _float_bits(first_value)
+    for timestamp, value in points[1:]:
+        delta = timestamp - previous_time
+        _write_varint(payload, _zigzag(delta - previous_delta))
+        previous_time, previous_delta = timestamp, delta
+
+        bits = _float_bits(value)
+        xor = bits ^ previous_bits
+        previous_bits = bits
+        if xor == 0:
+            payload.append(0)
+            continue
+        xor_bytes = xor.to_bytes(8, 'big')
+        leading = min((len(xor_bytes) - len(xor_bytes.lstrip(b'\x00'))), 7)
+        trailing = min((len(xor_bytes) - len(xor_bytes.rstrip(b'\x00'))), 7 - leading)
+        payload.append(0x80 | (leading << 3) | trailing)
+        payload += xor_bytes[leading:8 - trailing]
+
+    name = name.encode('utf-8')
+    payload = bytes(payload)
+    return BLOCK_HEADER.pack(len(payload), zlib.crc32(payload), len(name)) + name + payload
+
+
+def decode_block(payload):
+    """ Generator of (timestamp_ms, value) points from a block payload """
+    count, offset = _read_varint(payload, 0)
+    if not count:
+        return
+    first_time, offset = _read_varint(payload, offset)
+    timestamp = _unzigzag(first_time)
+    value_bits = _float_bits(struct.unpack_from('>d', payload, offset)[0])
+    offset += 8
+    yield (timestamp, _bits_float(value_bits))
+
+    delta = 0
+    for _ in range(count - 1):
+        delta_of_delta, offset = _read_varint(payload, offset)
+        delta += _unzigzag(delta_of_delta)
+        timestamp += delta
+
+        control = payload[offset]
+        offset += 1
+        if control:
+            leading = (control >> 3) & 0x07
+            trailing = control & 0x07
+            size = 8 - leading - trailing
+            xor = int.from_bytes(payload[offset:offset + size], 'big') << (8 * trailing)
+            offset += size
+            value_bits ^= xor
+        yield (timestamp, _bits_float(value_bits))
+
+
+def read_segment(path, name=None):
+    """ Stream points from a segment file. Blocks for other
+        series are skipped without decoding. Stops at the
+        first corrupt or partial block (i.e. power loss).
+    """
+    _name = name.encode('utf-8') if name is not None else None
+    try:
+        file = open(path, 'rb')
+    except OSError:
+        return
+    with file:
+        while True:
+            header = file.read(BLOCK_HEADER.size)
+            if len(header) < BLOCK_HEADER.size:
+                return
+            payload_length, checksum, name_length = BLOCK_HEADER.unpack(header)
+            block_name = file.read(name_length)
+            if _name is not None and block_name != _name:
+                file.seek(payload_length, os.SEEK_CUR)
+                continue
+            payload = file.read(payload_length)
+            if len(payload) < payload_length or zlib.crc32(payload) != checksum:
+                Logger.log(LOG_LEVEL["warning"],
+                   f"History Store Found Corrupt Block in {path}")
+                return
+            yield from decode_block(payload)
+
+
+def repair_segment(path):
+    """ Truncate a segment after its last complete block.
+        Returns the number of bytes removed.
+    """
+    try:
+        file = open(path, 'r+b')
+    except FileNotFoundError:
+        return 0
+    with file:
+        size = os.fstat(file.fileno()).st_size
+        valid = 0
+        while valid < size:
+            header = file.read(BLOCK_HEADER.size)
+            if len(header) < BLOCK_HEADER.size:
+                break
+            payload_length, checksum, name_length = BLOCK_HEADER.unpack(header)
+            block_name = file.read(name_length)
+            payload = file.read(payload_length)
+            if len(block_name) < name_length or len(payload) < payload_length \
+                    or zlib.crc32(payload) != checksum:
+                break
+            valid = file.tell()
+        if valid < size:
+            file.truncate(valid)
+            file.flush()
+            os.fsync(file.fileno())
+            Logger.log(LOG_LEVEL["warning"],
+               f"History Store Truncated {size - valid} Bytes of Partial Data From {path}")
+        return size - valid
+
+
+""" Helpers """
+def series_name(component_id, key=None):
+    """ Return the stored name of a series """
+    return component_id if key is None else f'{component_id}:{key}'
+
+
+def _to_timestamp(value):
+    if isinstance(value, datetime.datetime):
+        return value.timestamp()
+    return value
+
+
+def _float_bits(value):
+    return struct.unpack('>Q', struct.pack('>d', value))[0]
+
+
+def _bits_float(bits):
+    return struct.unpack('>d', struct.pack('>Q', bits))[0]
+
+
+def _zigzag(value):
+    return (value << 1) ^ (value >> 63)
+
+
+def _unzigzag(value):
+    return (value >> 1) ^ -(value & 1)
+
+
+def _write_varint(buffer, value):
+    while value > 0x7F:
+        buffer.append((value & 0x7F) | 0x80)
+        value >>= 7
+    buffer.append(value)
+
+
+def _read_varint(buffer, offset):
+    result = 0
+    shift = 0
+    while True:
+        byte = buffer[offset]
+        offset += 1
+        result |= (byte & 0x7F) << shift
+        if not byte & 0x80:
+            return result, offset
+        shift += 7
@@ -1,34 +1,82 @@
 import json
-import redis
+import time
 import datetime
 import threading
+from uuid import uuid4
+from collections import OrderedDict
 
-from mudpi.constants import FONT_RESET, FONT_YELLOW
 from mudpi.logger.Logger import Logger, LOG_LEVEL
+from mudpi.managers.backends import StateBackend
+from mudpi.managers.history_store import HistoryStore
+from mudpi.managers.history_manager import HistoryManager, is_number
+from mudpi.constants import FONT_RESET, FONT_YELLOW
 
 
 class StateManager():
     """
      A Central Manager to Control All States in MudPi.
 
-     It will keep a sync of state with redis so that data
+     It will keep a sync of state with a backend so that data
      can be recovered on restart and shared with the frontend.
+
+     Backends (`mudpi.states.backend`):
+        `redis`  - Shared with the frontend. (Default)
+        `sqlite` - Local database file, no server needed.
+        `memory` - Nothing is saved between restarts.
+
+     Recent numeric values are kept in memory ring buffers
+     configured with `mudpi.states.history` (`false` disables).
+     Longer history can be saved to disk by setting `mudpi.states.store`.
+
+     Small numeric changes can be filtered with `mudpi.states.deadband`
+     per component id or classifier. Filtered values are still
+     published once `max_silence` seconds pass without an update.
+
+     Every change is stamped with a global `version` so clients can
+     sync with `changes_since(version)` or the `mudpi:state_versions`
+     sorted set in redis instead of reading every state.
+
+     Components with `expires` pass a `ttl` to `set()` with each new
+     reading. If no reading is set within the ttl the state is marked `stale` and a
+     `StateExpired` event is published on `sensor` from the core timers.
+     The last value is kept and the next reading clears `stale`.
      """
 
-    def __init__(self, mudpi, redis_conf=None):
+    def __init__(self, mudpi, redis_conf=None, config=None):
         self.mudpi = mudpi
+        self.config = config or {}
         self.states = {}
+        self.version = 0
+        # Component ids ordered by the version they last changed
+        self._versions = OrderedDict()
         self._lock = threading.RLock()
-        host = '127.0.0.1'
-        port = 6379
+        _history = self.config.get('history', {})
+        self.recent = HistoryManager(_history if isinstance(_history, dict) else {}) \
+            if _history is not False else None
+        self.deadband = Deadband(self.config.get('deadband') or {})
+        self._published_at = {}
+        # Pending expiry timers by component id
+        self._expiries = {}
+        _store = self.config.get('store')
+        self.store_history = HistoryStore(_store.get('path') or self.mudpi.config.path('history'), _store) \
+            if isinstance(_store, dict) else None
+        self._history_flush = None
+        self._schedule_history_flush()
+        _backend = str(self.config.get('backend', 'redis')).lower()
+        if _backend not in StateBackend.backends:
+            Logger.log(LOG_LEVEL["warning"],
+               f"State Manager Unknown Backend {_backend}, Using `memory`")
+            _backend = 'memory'
+        _backend_config = dict(self.config)
+        if _backend == 'redis':
+            # Default to the same redis server as the event system
+            _backend_config = {**(redis_conf or {}), **self.config, **(self.config.get('redis') or {})}
+        self.backend = StateBackend.backends[_backend](self, _backend_config)
         try:
-            if redis_conf:
-                host = redis_conf.get('host', '127.0.0.1')
-                port = redis_conf.get('port', 6379)
-            self.redis = redis.Redis(host=host, port=port)
+            self.backend.connect()
         except Exception as error:
             Logger.log(LOG_LEVEL["error"],
-               f"State Manager Error Connecting to Redis")
+               f"State Manager Error Connecting to {_backend} Backend. {error}")
 
         self.restore_states()
 
@@ -43,14 +91,35 @@ class StateManager():
             return list(self.states.values())
 
     def remove(self, id):
+        removed = self.remove_many([id])
+        return removed[0] if removed else None
+
+    def remove_many(self, ids):
+        """ Remove a batch of states with a single backend write """
         with self._lock:
-            return self.states.pop(id.lower(), None)
+            removed = [ state for state in 
+                (self.states.pop(_id.lower(), None) for _id in ids)
+                if state is not None ]
+            for state in removed:
+                self._versions.pop(state.component_id, None)
+                self._cancel_expiry(state.component_id)
+        if removed:
+            self.backend.remove([state.component_id for state in removed])
+            if self.recent is not None:
+                for state in removed:
+                    self.recent.remove(state.component_id)
+        return removed
 
     def id_exists(self, _id):
         _id = _id.lower()
         return _id in self.states
 
-    def set(self, component_id, new_state, metadata=None):
+    def set(self, component_id, new_state, metadata=None, ttl=None):
+        """ Store a new state for a component. If a `ttl` is given
+            the state goes stale after that many seconds without another
+            reading. A `ttl` of None stores a cached value without
+            restarting the expiry, 0 stops any expiry.
+        """
         if new_state is None:
             return
 
@@ -63,35 +132,188 @@ class StateManager():
             previous_state = self.states.get(component_id)
 
             state_exists = previous_state is not None
+            state_is_stale = state_exists and previous_state.stale
             state_is_same = (state_exists and previous_state.state == new_state)
-            metadata_is_same = (state_exists and previous_state.metadata == metadata)
+            # Stale is set by the manager so components never send it
+            _previous_metadata = previous_state.metadata if state_exists else None
+            if state_is_stale:
+                _previous_metadata = { key: value for key, value in
+                    _previous_metadata.items() if key != 'stale' }
+            metadata_is_same = (state_exists and _previous_metadata == metadata)
 
-            if state_is_same and metadata_is_same:
+            # A `ttl` comes with each new reading. Components storing
+            # a cached value pass None to leave the expiry running.
+            if ttl:
+                self._schedule_expiry(component_id, ttl)
+            elif ttl is not None and component_id in self._expiries:
+                self._cancel_expiry(component_id)
+
+            # A new reading always replaces a stale state to clear
+            # the flag even if it is the same or within the deadband
+            _clear_stale = state_is_stale and (ttl is not None or not state_is_same)
+            if state_is_same and metadata_is_same and not _clear_stale:
                 self._lock.release()
                 return
 
+            if state_exists and metadata_is_same and not _clear_stale and self.deadband.enabled:
+                # Compare to the last published state (not the last reading)
+                # so slow drift still publishes once it leaves the band
+                band = self.deadband.get(component_id, metadata.get('classifier'))
+                if band and band.within(previous_state.state, new_state):
+                    _silence = time.monotonic() - self._published_at.get(component_id, 0)
+                    if band.max_silence is None or _silence < band.max_silence:
+                        self._lock.release()
+                        if self.recent is not None:
+                            self.recent.record(component_id, new_state)
+                        return
+
             updated_at = previous_state.updated_at if state_is_same else None
 
-            state = State(component_id, new_state, metadata, updated_at)
+            self.version += 1
+            state = State(component_id, new_state, metadata, updated_at, version=self.version)
             self.states[component_id] = state
+            self._versions[component_id] = state.version
+            self._versions.move_to_end(component_id)
+            self._published_at[component_id] = time.monotonic()
             self._lock.release()
 
-            if previous_state:
-                previous_state = previous_state.to_dict()
+            if not state_is_same:
+                if self.recent is not None:
+                    self.recent.record(component_id, new_state)
+                if self.store_history is not None:
+                    self.store_history.record(component_id, new_state)
+
+            # Build the event from the cached encodings instead of
+            # letting the bus copy and encode the nested states again
+            _uuid = str(uuid4())
+            self.mudpi.events.publish('state', b''.join((
+                b'{"event": "StateUpdated", "component_id": ', json.dumps(component_id).encode('utf-8'),
+                b', "previous_state": ', previous_state.to_json() if previous_state else b'null',
+                b', "new_state": ', state.to_json(),
+                b', "uuid": "', _uuid.encode('utf-8'), b'"}'
+            )))
+            self.backend.save(state, is_new=not state_exists)
             event_data = {
                 'event': 'StateUpdated',
                 'component_id': component_id,
-                'previous_state': previous_state,
-                'new_state': state.to_dict()
+                'previous_state': previous_state.to_dict() if previous_state else None,
+                'new_state': state.to_dict(),
+                'uuid': _uuid
             }
-
-            self.mudpi.events.publish('state', event_data)
-            self.redis.set(f'{component_id}.state', json.dumps(state.to_dict()))
-            self.redis.set('state_keys', json.dumps(self.ids()))
             Logger.log(LOG_LEVEL["debug"],
                f"State Changed: {FONT_YELLOW}{component_id}{FONT_RESET} - {state.state} @ {state.updated_at}")
             return event_data
 
+    def expire(self, component_id, ttl=None):
+        """ Mark a state as stale and publish a `StateExpired` event """
+        component_id = component_id.lower()
+        with self._lock:
+            previous_state = self.states.get(component_id)
+            if previous_state is None or previous_state.stale:
+                return
+            self._cancel_expiry(component_id)
+            self.version += 1
+            state = State(component_id, previous_state.state, {**previous_state.metadata, 'stale': True},
+                previous_state.updated_at, previous_state.source_id, version=self.version)
+            self.states[component_id] = state
+            self._versions[component_id] = state.version
+            self._versions.move_to_end(component_id)
+
+        self.backend.save(state)
+        # Keeps the topic and fields sensors used for this event
+        event_data = {
+            'event': 'StateExpired',
+            'component_id': component_id,
+            'expires': ttl,
+            'previous_state': previous_state.state,
+            'type': getattr(self.mudpi.components.get(component_id), 'type', None),
+            'classifier': previous_state.metadata.get('classifier'),
+            'new_state': state.to_dict()
+        }
+        self.mudpi.events.publish('sensor', event_data)
+        Logger.log(LOG_LEVEL["debug"],
+           f"State Expired: {FONT_YELLOW}{component_id}{FONT_RESET} - No Update in {ttl}s")
+        return event_data
+
+    def _schedule_expiry(self, component_id, ttl):
+        """ Replace the expiry timer of a state """
+        self._cancel_expiry(component_id)
+        self._expiries[component_id] = self.mudpi.timers.call_later(
+            float(ttl), self._expire, component_id, ttl)
+
+    def _cancel_expiry(self, component_id):
+        timer = self._expiries.pop(component_id, None)
+        if timer is not None:
+            timer.cancel()
+
+    def _expire(self, component_id, ttl):
+        """ Timer callback, skips timers replaced since they fired """
+        with self._lock:
+            timer = self._expiries.get(component_id)
+            if timer is None or timer.fired_at is None:
+                return
+        return self.expire(component_id, ttl)
+
+    def _schedule_history_flush(self):
+        """ Write buffered history every `flush_interval` even
+            if no new values are recorded to trigger a flush """
+        if self.store_history is None or self.store_history.flush_interval <= 0:
+            return
+        self._history_flush = self.mudpi.timers.call_later(
+            self.store_history.flush_interval, self._flush_history)
+
+    def _flush_history(self):
+        """ Timer callback, the disk write runs off the timer thread """
+        if self._history_flush is None:
+            # Manager was closed
+            return
+        _executor = getattr(self.mudpi.actions, 'executor', None)
+        if _executor is not None:
+            _executor.submit('state:history', 'state.history_flush', self.store_history.flush)
+        else:
+            self.store_history.flush()
+        self._schedule_history_flush()
+
+    def history(self, id, since=None, key=None):
+        """ Return recent [timestamp, value] pairs for a state
+            Use `key` to select a value from dict states.
+        """
+        if self.recent is None:
+            return []
+        return self.recent.get(id.lower(), since, key)
+
+    def history_action(self, data=None):
+        """ Action to publish recent history of a state
+            Data: {component, since, key}
+        """
+        data = data or {}
+        component_id = data.get('component')
+        if not component_id:
+            return
+        since = data.get('since')
+        if since is not None:
+            try:
+                since = float(since)
+            except (TypeError, ValueError):
+                Logger.log(LOG_LEVEL["error"],
+                   f"State History Invalid `since` {since!r} for {component_id}. Expected a Timestamp.")
+                return
+        event_data = {
+            'event': 'StateHistory',
+            'component_id': component_id.lower(),
+            'key': data.get('key'),
+            'since': since,
+            'history': self.history(component_id, since, data.get('key'))
+        }
+        self.mudpi.events.publish('state', event_data)
+        return event_data
+
+    def history_range(self, id, start=None, end=None, key=None):
+        """ Stream [timestamp, value] pairs from the on-disk store """
+        if self.store_history is None:
+            return iter(())
+        return self.store_history.scan(id.lower(), start, end, key)
+
     def ids(self):
         """ Return the keys of all the stored states """
         return [
@@ -99,66 +321,234 @@ class StateManager():
             for item in self.states.values()
         ]
 
+    def changes_since(self, version=0):
+        """ Return states changed after the given version oldest first.
+            Cost is based on the number of changes not total states.
+        """
+        version = int(version or 0)
+        changed = []
+        with self._lock:
+            for component_id in reversed(self._versions):
+                if self._versions[component_id] <= version:
+                    break
+                changed.append(self.states[component_id])
+        changed.reverse()
+        return changed
+
+    def changes_action(self, data=None):
+        """ Action to publish states changed since a version
+            Data: {version}
+        """
+        data = data or {}
+        with self._lock:
+            _version = self.version
+            changed = self.changes_since(data.get('version', 0))
+        event_data = {
+            'event': 'StateChanges',
+            'since': data.get('version', 0),
+            'version': _version,
+            'states': [state.to_dict() for state in changed]
+        }
+        self.mudpi.events.publish('state', event_data)
+        return event_data
+
     def restore_states(self):
-        """ Restore states from Redis 
+        """ Restore states from the backend
             Resumes state of previous run if system has not cleared memory. 
         """
-        self.redis.set('started_at', str(datetime.datetime.now()))
-        
-        keys = self.redis.get('state_keys')
-        if keys:
-            keys = json.loads(keys)
-            for key in keys:
-                data = self.redis.get(f'{key}.state')
-                _state = State.from_json(data)
-                self.states[key] = _state
+        _start = time.perf_counter()
+        try:
+            self.backend.set_value('started_at', str(datetime.datetime.now()))
+            _cache = self.backend.get_value('requirement_installed')
+            _version, stored = self.backend.load()
+        except Exception as error:
+            Logger.log(LOG_LEVEL["error"],
+               f"State Manager Failed to Restore States. {error}")
+            _cache, _version, stored = None, 0, []
+
+        # Continue versions from the last run so clients stay in sync
+        self.version = _version
+        _restored = []
+        for data in stored:
+            _state = State.from_json(data)
+            self.states[_state.component_id] = _state
+            _restored.append(_state)
+            self.version = max(self.version, _state.version)
+        for _state in sorted(_restored, key=lambda _state: _state.version):
+            self._versions[_state.component_id] = _state.version
 
         # Restore requirement cache
-        _cache = self.redis.get('requirement_installed')
         if _cache:
             self.mudpi.cache['requirement_installed'] = json.loads(_cache)
 
+        _duration = time.perf_counter() - _start
+        self.mudpi.cache.setdefault('metrics', {})['state_restore'] = {
+            'states': len(self.states),
+            'duration': round(_duration, 4)
+        }
+        Logger.log(LOG_LEVEL["debug"],
+           f"Fetched {len(self.states)} Stored States in {_duration * 1000:.1f}ms")
+
+    def close(self):
+        """ Flush any buffered data before shutdown """
+        with self._lock:
+            for component_id in list(self._expiries):
+                self._cancel_expiry(component_id)
+        if self._history_flush is not None:
+            self._history_flush.cancel()
+            self._history_flush = None
+        if self.store_history is not None:
+            self.store_history.close()
+        self.backend.close()
+
     def cache(self):
         """ Cache some important states and data for MudPi """
         if self.mudpi.cache.get('requirement_installed'):
-            self.redis.set('requirement_installed', json.dumps(self.mudpi.cache['requirement_installed']))
+            self.backend.set_value('requirement_installed', json.dumps(self.mudpi.cache['requirement_installed']))
+
+
+class Deadband():
+    """ Lookup of deadbands for numeric states 
+
+        Config Example:
+        {
+            "max_silence": 300,
+            "classifiers": {"temperature": {"absolute": 0.2}},
+            "components": {"soil_1": {"percent": 2, "max_silence": 60}}
+        }
+    """
+
+    def __init__(self, config=None):
+        self.config = config or {}
+        _max_silence = self.config.get('max_silence')
+        self.components = {
+            str(key).lower(): Band(conf, _max_silence)
+            for key, conf in (self.config.get('components') or {}).items()
+        }
+        self.classifiers = {
+            str(key).lower(): Band(conf, _max_silence)
+            for key, conf in (self.config.get('classifiers') or {}).items()
+        }
+
+    @property
+    def enabled(self):
+        """ Return if any deadbands are configured """
+        return bool(self.components or self.classifiers)
+
+    def get(self, component_id, classifier=None):
+        """ Return the band for a component, component bands
+            take priority over classifier bands. """
+        band = self.components.get(component_id)
+        if band is None and classifier:
+            band = self.classifiers.get(str(classifier).lower())
+        return band
+
+
+class Band():
+    """ A deadband with an `absolute` and/or `percent` tolerance """
+
+    __slots__ = ('absolute', 'percent', 'max_silence')
+
+    def __init__(self, config, max_silence=None):
+        self.absolute = float(config.get('absolute', 0))
+        self.percent = float(config.get('percent', 0))
+        _max_silence = config.get('max_silence', max_silence)
+        self.max_silence = float(_max_silence) if _max_silence is not None else None
+
+    def within(self, previous, new):
+        """ Return if the change from previous to new is noise.
+            Dict states must only differ by numeric values
+            that are all within the band.
+        """
+        if isinstance(previous, dict) and isinstance(new, dict):
+            if previous.keys() != new.keys():
+                return False
+            return all(self.within(previous[key], new[key]) for key in new)
+
+        if not (is_number(previous) and is_number(new)):
+            return previous == new
+
+        change = abs(new - previous)
+        if change <= self.absolute:
+            return True
+        return self.percent > 0 and change <= abs(previous) * self.percent / 100
 
 
 class State():
     """ 
     A Class for Stored State from Components
+
+    States are immutable so their dict and json encodings
+    are built once on first use and shared by the event
+    bus and redis writes. Do not modify `to_dict()` results.
     """
+
+    __slots__ = ('component_id', 'state', 'metadata', 'updated_at', 'source_id',
+        'version', 'timestamp', 'monotonic', '_dict', '_json')
+
     @classmethod
     def from_json(cls, data):
         parsed_data = json.loads(data)
-        return cls(parsed_data['component_id'], parsed_data['state'], parsed_data.get('metadata'), parsed_data['updated_at'], parsed_data.get('source_id'))
+        state = cls(parsed_data['component_id'], parsed_data['state'], parsed_data.get('metadata'), parsed_data['updated_at'], parsed_data.get('source_id'), parsed_data.get('version', 0))
+        if isinstance(data, bytes):
+            # Reuse the stored encoding since it came from `to_json()`
+            object.__setattr__(state, '_json', data)
+        return state
 
     def __init__(
         self,
         component_id,
-        state = {},
-        metadata = {},
-        updated_at = datetime.datetime.now(),
-        source_id = None
+        state = None,
+        metadata = None,
+        updated_at = None,
+        source_id = None,
+        version = 0
         ):
-        self.component_id = component_id
-        self.state = state
-        self.metadata = metadata # Used for UI like icons, measure units, and display names.
-        self.updated_at = updated_at if updated_at is not None else datetime.datetime.now().replace(microsecond=0)
-        self.source_id = source_id
+        _set = object.__setattr__
+        _set(self, 'component_id', component_id)
+        _set(self, 'state', state if state is not None else {})
+        _set(self, 'metadata', metadata or {}) # Used for UI like icons, measure units, and display names.
+        _set(self, 'timestamp', time.time())
+        _set(self, 'monotonic', time.monotonic())
+        _set(self, 'updated_at', updated_at if updated_at is not None else \
+            datetime.datetime.fromtimestamp(self.timestamp).replace(microsecond=0))
+        _set(self, 'source_id', source_id)
+        _set(self, 'version', version)
+        _set(self, '_dict', None)
+        _set(self, '_json', None)
 
     @property
     def name(self):
         return self.metadata.get('name', "Unknown")
 
+    @property
+    def stale(self):
+        """ Return if the state expired without a new value """
+        return bool(self.metadata.get('stale'))
+
     def to_dict(self):
-        return {
-            'component_id':self.component_id,
-            'state': self.state,
-            'metadata': self.metadata,
-            'updated_at': str(self.updated_at),
-            'source_id': self.source_id
-        }
+        if self._dict is None:
+            object.__setattr__(self, '_dict', {
+                'component_id':self.component_id,
+                'state': self.state,
+                'metadata': self.metadata,
+                'updated_at': str(self.updated_at),
+                'source_id': self.source_id,
+                'version': self.version
+            })
+        return self._dict
+
+    def to_json(self):
+        """ Return the encoded state as utf-8 json bytes """
+        if self._json is None:
+            object.__setattr__(self, '_json', json.dumps(self.to_dict()).encode('utf-8'))
+        return self._json
+
+    def __setattr__(self, name, value):
+        raise AttributeError(f"State is immutable, can not set `{name}`")
+
+    def __delattr__(self, name):
+        raise AttributeError(f"State is immutable, can not delete `{name}`")
 
     def __eq__(self, other):
         """ Provide a way to check if 'state == state'. """
@@ -169,4 +559,4 @@ class State():
 
     def __repr__(self):
         """ Representation of state. (Handy for debugging) """
-        return f"<State {self.component_id}={self.state} {', '.join(self.metadata.values())} @ {self.updated_at}>"
+        return f"<State {self.component_id}={self.state} {', '.join(str(value) for value in self.metadata.values())} @ {self.updated_at}>"
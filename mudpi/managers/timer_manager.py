@@ -0,0 +1,125 @@
+"""
+MudPi Timer Manager
+
+Schedules callbacks at a point in time using a single
+heap and thread. Components can register deadlines
+instead of polling for elapsed time each cycle.
+"""
+import time
+import heapq
+import itertools
+import threading
+from mudpi.logger.Logger import Logger, LOG_LEVEL
+
+
+class TimerManager:
+    """ Runs callbacks when their deadline is reached
+
+        Deadlines use `time.monotonic()` so wall clock changes
+        do not affect them. Callbacks run on the timer thread
+        and should return quickly to avoid delaying others.
+    """
+
+    def __init__(self, mudpi):
+        self.mudpi = mudpi
+        self._heap = []
+        self._counter = itertools.count()
+        self._condition = threading.Condition()
+        self._running = False
+        self._thread = None
+
+    """ Methods """
+    def call_later(self, delay, callback, *args):
+        """ Run the callback after a delay in seconds """
+        return self.call_at(time.monotonic() + max(delay, 0), callback, *args)
+
+    def call_at(self, deadline, callback, *args):
+        """ Run the callback at a `time.monotonic()` deadline """
+        timer = Timer(deadline, callback, args)
+        with self._condition:
+            heapq.heappush(self._heap, (deadline, next(self._counter), timer))
+            # Only wake the thread if this is now the next timer due
+            if self._heap[0][2] is timer:
+                self._condition.notify()
+        return timer
+
+    def start(self):
+        """ Start the timer thread and return it """
+        if not self._thread:
+            self._running = True
+            self._thread = threading.Thread(target=self.run, name='timers', daemon=True)
+            self._thread.start()
+        return self._thread
+
+    def stop(self):
+        """ Stop the timer thread """
+        with self._condition:
+            self._running = False
+            self._condition.notify()
+
+    def run(self):
+        """ Wait for the next deadline and run due timers """
+        while True:
+            with self._condition:
+                while self._running:
+                    # Drop cancelled timers so they don't wake the thread
+                    while self._heap and self._heap[0][2].cancelled:
+                        heapq.heappop(self._heap)
+                    if not self._heap:
+                        self._condition.wait()
+                        continue
+                    delay = self._heap[0][0] - time.monotonic()
+                    if delay <= 0:
+                        break
+                    self._condition.wait(delay)
+                if not self._running:
+                    return
+                timer = heapq.heappop(self._heap)[2]
+
+            timer.run()
+
+    @property
+    def pending(self):
+        """ Return the number of scheduled timers """
+        return len([ item for item in self._heap if not item[2].cancelled ])
+
+
+class Timer:
+    """ Handle for a scheduled callback """
+
+    __slots__ = ('deadline', 'callback', 'args', 'cancelled', 'fired_at')
+
+    def __init__(self, deadline, callback, args=()):
+        self.deadline = deadline
+        self.callback = callback
+        self.args = args
+        self.cancelled = False
+        self.fired_at = None
+
+    @property
+    def lateness(self):
+        """ Seconds between the deadline and the actual fire """
+        if self.fired_at is None:
+            return None
+        return self.fired_at - self.deadline
+
+    def cancel(self):
+        """ Prevent the callback from running """
+        self.cancelled = True
+
+    def run(self):
+        """ Run the callback unless cancelled """
+        if self.cancelled:
+            return
+        self.fired_at = time.monotonic()
+        try:
+            self.callback(*self.args)
+        except Exception as error:
+            Logger.log(LOG_LEVEL["error"],
+               f"Timer Callback {getattr(self.callback, '__qualname__', self.callback)} Failed. {error}")
+
+    def __lt__(self, other):
+        return self.deadline < other.deadline
+
+    def __repr__(self):
+        return f"<Timer {getattr(self.callback, '__qualname__', self.callback)} @ {self.deadline}>"
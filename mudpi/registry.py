@@ -1,7 +1,9 @@
 import json
+from concurrent.futures import Future
 from mudpi.exceptions import MudPiError
 from mudpi.constants import FONT_YELLOW, FONT_RESET
 from mudpi.logger.Logger import Logger, LOG_LEVEL
+from mudpi.managers.action_executor import fan_out
 
 class Registry:
     """ Key-Value database for managing object instances """
@@ -45,65 +47,106 @@ class Registry:
 class ComponentRegistry(Registry):
     """ Comopnent Database
         Stores components per namespace for MudPi
+
+        Components are also indexed by id and interface
+        so lookups don't need to search every namespace.
+        Ids are matched exactly ignoring case.
     """
+    def __init__(self, mudpi, name):
+        super().__init__(mudpi, name)
+        self._ids = {}
+        self._interfaces = {}
+
     def get(self, component_id):
         """ Get an item for the specified key """
         try:
-            component = [ component 
-            for components in self._registry.values()
-            for _id, component in components.items() 
-            if _id in component_id ][0]
-        except Exception as error:
-            component = None
-        return component
+            return self._ids.get(component_id.lower())
+        except AttributeError:
+            return None
 
     def for_namespace(self, namespace=None):
         """ Get all the components for a given namespace """
         return self._registry.setdefault(namespace, {})
 
-    def for_interface(self, interface=None):
+    def for_interface(self, interface=None, namespace=None):
         """ Get all the components for a given interface """
-        try:
-            components = [ component 
-            for components in self._registry.values()
-            for _id, component in components.items() 
-            if component.interface in interface ]
-        except Exception as error:
-            components = []
-        return components
+        components = self._interfaces.get(interface, {}).values()
+        if namespace is not None:
+            return [ component for component in components
+                if component.namespace == namespace ]
+        return list(components)
 
     def exists(self, component_ids):
-        """ Return if key exists in the registry """
-        return any([ exists for components in self._registry.values()
-            for exists in components 
-            if exists in component_ids ])
+        """ Return if any of the component ids are registered """
+        if isinstance(component_ids, str):
+            component_ids = [component_ids]
+        return any(str(_id).lower() in self._ids for _id in component_ids)
 
     def register(self, component_id, component, namespace=None):
         """ Registers the component into the registry """
         namespace_registry = self._registry.setdefault(namespace, {})
         if component_id not in namespace_registry:
             self.mudpi.events.publish('core', {'event': 'ComponentRegistered', 'component': component_id, 'namespace': namespace})
+        _previous = self._ids.get(component_id.lower())
+        if _previous is not None and _previous is not component:
+            if _previous.namespace != namespace:
+                Logger.log(LOG_LEVEL["warning"],
+                   f"Component {FONT_YELLOW}{component_id}{FONT_RESET} registered in {namespace} and {_previous.namespace}.")
+            self._remove_index(component_id)
         namespace_registry[component_id] = component
+        self._ids[component_id.lower()] = component
+        self._interfaces.setdefault(getattr(component, 'interface', None), {})[component_id.lower()] = component
+        return component
+
+    def unregister(self, component_id):
+        """ Remove the component from the registry """
+        component = self.get(component_id)
+        if component is None:
+            return None
+        component.component_removed(mudpi=self.mudpi)
+        self._remove_index(component_id)
+        namespace_registry = self._registry.get(component.namespace, {})
+        for _id in [ _id for _id, _comp in namespace_registry.items() if _comp is component ]:
+            del namespace_registry[_id]
+        self.mudpi.events.publish('core', {'event': 'ComponentUnregistered', 'component': component_id, 'namespace': component.namespace})
         return component
 
     def ids(self):
         """ Return all the registered component ids """
-        return [ component.id 
-            for components in self._registry.values()
-            for component in components.values() ]
+        return [ component.id for component in self._ids.values() ]
+
+    def _remove_index(self, component_id):
+        """ Drop a component from the id and interface indexes """
+        component = self._ids.pop(component_id.lower(), None)
+        if component is not None:
+            _interface = self._interfaces.get(getattr(component, 'interface', None), {})
+            _interface.pop(component_id.lower(), None)
+        return component
 
 
 class ActionRegistry(Registry):
     """ Database of actions available to MudPi from 
         user configs or components. 
         None = global
+
+        Action strings are resolved once into a `CallPlan`
+        and cached until another action is registered.
     """
+    def __init__(self, mudpi, name):
+        super().__init__(mudpi, name)
+        self._plans = {}
+        # Publish an `ActionCall` event for each call (`mudpi.actions.audit`)
+        self.audit = True
+        # Runs `call_async()` calls, set by the core once loaded
+        self.executor = None
+
     def register(self, action_key, func, namespace=None, validator=None):
         """ Register the action under the specified namespace. """
         namespace_registry = self._registry.setdefault(namespace, {})
         if action_key not in namespace_registry:
             self.mudpi.events.publish('core', {'event': 'ActionRegistered', 'action': action_key, 'namespace': namespace})
         namespace_registry[action_key] = Action(func, validator)
+        self._plans.clear()
 
     def for_namespace(self, namespace=None):
         """ Get all the actions for a given namespace """
@@ -111,9 +154,20 @@ class ActionRegistry(Registry):
 
     def exists(self, action_key):
         """ Return if action exists for given action command """
-        action = self.parse_call(action_key)
-        registry = self._registry.setdefault(action['namespace'], {})
-        return action['action'] in registry
+        return self.plan(action_key) is not None
+
+    def plan(self, action_call):
+        """ Return a cached `CallPlan` for the action call or
+            None if the action is not registered. """
+        plan = self._plans.get(action_call)
+        if plan is None:
+            command = self.parse_call(action_call)
+            action = self._registry.get(command['namespace'], {}).get(command['action'])
+            if action is None:
+                return None
+            plan = self._plans[action_call] = CallPlan(self, action_call, command['namespace'], action,
+                command['action'].rsplit('.', 1)[0].lower() if command['namespace'] is None and '.' in command['action'] else None)
+        return plan
 
     def parse_call(self, action_call):
         """ Parse a command string and extract the namespace and action """
@@ -142,24 +196,59 @@ class ActionRegistry(Registry):
             Format: {namespace}.{action} or 
                     {namespace}.{component}.{action}
         """
-        command = self.parse_call(action_call)
-        action = self._registry.get(command['namespace'], {}).get(command['action'])
-        if not action:
+        plan = self.plan(action_call)
+        if plan is None:
             # raise MudPiError("Call to action that doesn't exists!")
             Logger.log(
                 LOG_LEVEL["error"],
                 f'{FONT_YELLOW}Call to action {action_call} that doesn\'t exists!.{FONT_RESET}'
             )
-        validated_data = action.validate(action_data)
-        if not validated_data and action_data:
-            # raise MudPiError("Action data was not valid!")
+            return
+        return plan(action_data)
+
+    def call_async(self, action_call, action_data={}):
+        """ Queue an action call to run on the executor.
+            Calls to the same component run in order even
+            if made through a namespace action.
+            Returns a Future or None if the action doesn't exist.
+        """
+        plan = self.plan(action_call)
+        if plan is None:
             Logger.log(
                 LOG_LEVEL["error"],
-                f'{FONT_YELLOW}Action data was not valid for {action_call}{FONT_RESET}'
+                f'{FONT_YELLOW}Call to action {action_call} that doesn\'t exists!.{FONT_RESET}'
             )
-        self.mudpi.events.publish('core', {'event': 'ActionCall', 'action': action_call, 'data': action_data, 'namespace': command['namespace']})
-        action(data=validated_data)
+            return None
+        if self.executor is None:
+            future = Future()
+            try:
+                future.set_result(plan(action_data))
+            except Exception as error:
+                future.set_exception(error)
+        else:
+            future = self.executor.submit(plan.lanes(action_data), action_call, plan, action_data)
+        if self.audit:
+            future.add_done_callback(lambda _future: self._completed(plan, _future))
+        return future
 
+    def fan_out(self, components, action, data=None, parallel=None):
+        """ Call an action method on many components. Runs `parallel`
+            calls at a time (Default `mudpi.actions.parallel`).
+            Returns results and timings of each component.
+        """
+        if self.executor is None:
+            return fan_out(components, action, data)
+        return self.executor.fan_out(components, action, data, parallel)
+
+    def _completed(self, plan, future):
+        """ Publish the result of an async call """
+        error = future.exception() if not future.cancelled() else 'Cancelled'
+        self.mudpi.events.publish('core', {
+            'event': 'ActionCompleted',
+            'action': plan.action_call,
+            'namespace': plan.namespace,
+            'error': str(error) if error else None
+        })
 
     def handle_call(self, event_data={}):
         """ Handle an Action call from event bus """
@@ -170,7 +259,55 @@ class ActionRegistry(Registry):
                 _data = event_data
             action = _data.get('action')
             if action:
-                return self.call(action, _data.get('data', {}))
+                return self.call_async(action, _data.get('data', {}))
+
+class CallPlan:
+    """ An action call string resolved to its registered action """
+
+    __slots__ = ('registry', 'action_call', 'namespace', 'action', 'component_id')
+
+    def __init__(self, registry, action_call, namespace, action, component_id=None):
+        self.registry = registry
+        self.action_call = action_call
+        self.namespace = namespace
+        self.action = action
+        # Set for `.{component}.{action}` calls
+        self.component_id = component_id
+
+    def lanes(self, action_data=None):
+        """ Return the ids of components the call acts on
+            so the executor can order calls per component.
+            Falls back to the namespace for other actions.
+        """
+        if self.component_id is not None:
+            return [self.component_id]
+        components = self.registry.mudpi.components
+        _ids = action_data.get('components') if isinstance(action_data, dict) else None
+        if _ids and isinstance(_ids, (list, tuple)):
+            _ids = [ str(_id).lower() for _id in _ids ]
+        elif self.namespace and '.' in self.namespace:
+            # Interface action `{namespace}.{interface}.{action}`
+            _namespace, _interface = self.namespace.split('.', 1)
+            _ids = [ component.id.lower() for component in components.for_interface(_interface, _namespace) ]
+        else:
+            _ids = [ _id.lower() for _id in components.for_namespace(self.namespace) ]
+        return _ids or [self.namespace or self.action_call]
+
+    def __call__(self, action_data={}):
+        validated_data = self.action.validate(action_data)
+        if not validated_data and action_data:
+            # raise MudPiError("Action data was not valid!")
+            Logger.log(
+                LOG_LEVEL["error"],
+                f'{FONT_YELLOW}Action data was not valid for {self.action_call}{FONT_RESET}'
+            )
+        if self.registry.audit:
+            self.registry.mudpi.events.publish('core', {'event': 'ActionCall', 'action': self.action_call, 'data': action_data, 'namespace': self.namespace})
+        return self.action(data=validated_data)
+
+    def __repr__(self):
+        return f'<CallPlan {self.action_call}>'
+
 
 class Action:
     """ A callback associated with a string """
@@ -83,12 +83,17 @@ class Worker:
             if self.mudpi.is_running:
                 if callable(func):
                     func()
-                for key, component in self.components.items():
-                    if component.should_update:
-                        component.update()
-                        component.store_state()
+                _polled = [component for component in self.components.values()
+                    if component.should_update]
+                for component in _polled:
+                    component.update()
+                    component.store_state()
                 self.reset_duration()
-                self._wait(self.update_interval)
+                # Components driven by events or timers don't need fast cycles
+                if _polled or callable(func):
+                    self._wait(self.update_interval)
+                else:
+                    self._wait(constants.DEFAULT_UPDATE_INTERVAL)
         # # MudPi Shutting Down, Perform Cleanup Below
         Logger.log_formatted(LOG_LEVEL["debug"],
                    f"Worker {self.key} ", "Stopping", "notice")
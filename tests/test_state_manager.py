@@ -0,0 +1,118 @@
+import os
+import time
+
+import mudpi.utils  # Load extensions in the same order as the core
+from mudpi.logger.Logger import Logger
+from mudpi.registry import ComponentRegistry
+from mudpi.managers.timer_manager import TimerManager
+from mudpi.managers.state_manager import StateManager
+from mudpi.extensions.mqtt.sensor import MQTTSensor
+
+
+class Events:
+    def __init__(self):
+        self.published = []
+
+    def subscribe(self, *args):
+        pass
+
+    def publish(self, topic, data=None):
+        self.published.append((topic, data))
+
+
+class Actions:
+    executor = None
+
+
+class Config:
+    def __init__(self, path):
+        self.config_path = path
+
+    def path(self, *path):
+        return os.path.join(self.config_path, *path)
+
+
+class MudPi:
+    """ Just enough of the core to store component states """
+    is_prepared = False
+    is_running = True
+
+    def __init__(self, path):
+        self.cache = {}
+        self.config = Config(path)
+        self.events = Events()
+        self.actions = Actions()
+        self.components = ComponentRegistry(self, 'components')
+        self.timers = TimerManager(self)
+
+
+def setup_module():
+    Logger.logger = Logger({
+        'mudpi': {'name': 'test', 'debug': False},
+        'logging': {'file': os.devnull, 'file_log_level': 'error', 'terminal_log_level': 'error'}
+    })
+
+
+def make_core(tmp_path):
+    mudpi = MudPi(str(tmp_path))
+    mudpi.timers.start()
+    mudpi.states = StateManager(mudpi, config={'backend': 'memory', 'history': False})
+    return mudpi
+
+
+def test_cached_value_still_expires(tmp_path):
+    """ A sensor storing its cached value each update goes stale
+        once messages stop arriving """
+    mudpi = make_core(tmp_path)
+    sensor = MQTTSensor(mudpi, {'key': 'silent', 'expires': 0.2})
+    try:
+        sensor.handle_event(21)
+        sensor.store_state()
+        # Worker keeps storing the same cached value every cycle
+        for _ in range(6):
+            time.sleep(0.05)
+            sensor.store_state()
+
+        assert mudpi.states.get('silent').stale
+        assert [data['event'] for topic, data in mudpi.events.published
+            if topic == 'sensor'] == ['StateExpired']
+    finally:
+        mudpi.states.close()
+        mudpi.timers.stop()
+
+
+def test_new_reading_clears_stale(tmp_path):
+    """ The same value arriving again is a new reading """
+    mudpi = make_core(tmp_path)
+    sensor = MQTTSensor(mudpi, {'key': 'feed', 'expires': 0.1})
+    try:
+        sensor.handle_event(21)
+        sensor.store_state()
+        time.sleep(0.2)
+        assert mudpi.states.get('feed').stale
+
+        sensor.store_state()
+        assert mudpi.states.get('feed').stale
+
+        sensor.handle_event(21)
+        sensor.store_state()
+        assert not mudpi.states.get('feed').stale
+    finally:
+        mudpi.states.close()
+        mudpi.timers.stop()
+
+
+def test_history_action_parses_since(tmp_path):
+    """ `since` from action data can arrive as a string """
+    mudpi = make_core(tmp_path)
+    mudpi.states.close()
+    mudpi.states = StateManager(mudpi, config={'backend': 'memory', 'history': True})
+    try:
+        mudpi.states.recent.record('probe', 10, timestamp=100)
+        mudpi.states.recent.record('probe', 20, timestamp=200)
+
+        assert mudpi.states.history_action({'component': 'probe', 'since': '150'})['history'] == [[200, 20]]
+        assert mudpi.states.history_action({'component': 'probe', 'since': 'yesterday'}) is None
+    finally:
+        mudpi.states.close()
+        mudpi.timers.stop()